@@ -0,0 +1,238 @@
+import asyncio
+import math
+import sqlite3
+import time
+
+from coingecko_client import api_url, async_get, http_get
+from config import get_db_path
+from database import get_connection
+from resources import shared_resource
+
+DAY_MS = 24 * 60 * 60 * 1000
+HOUR_MS = 60 * 60 * 1000
+
+# Stored series synced more recently than this are served without a delta fetch
+SYNC_INTERVAL = 5 * 60
+
+# Candle or point size of each granularity, in milliseconds
+GRANULARITY_STEPS = {
+    '30m': HOUR_MS // 2,
+    '4h': 4 * HOUR_MS,
+    '4d': 4 * DAY_MS,
+    'daily': DAY_MS,
+    'hourly': HOUR_MS,
+}
+
+# /ohlc only accepts these day counts; each candle size maps to a subset of them
+OHLC_DAYS = {
+    '30m': [1],
+    '4h': [7, 14, 30],
+    '4d': [90, 180, 365],
+}
+
+# Columns of a stored row, in the order read() returns them
+CANDLE_COLUMNS = ['ts', 'open', 'high', 'low', 'close', 'volume', 'market_cap']
+
+
+def granularity(kind, days):
+    """Granularity CoinGecko returns for a series kind ('ohlc', 'daily' or 'hourly') and range"""
+    if kind == 'ohlc':
+        days = float(days)
+        # Same candle sizes as CoinGecko: 30 minutes, 4 hours or 4 days
+        if days <= 2:
+            return '30m'
+        if days <= 30:
+            return '4h'
+        return '4d'
+    return kind
+
+
+def series_request(coin_id, kind, days):
+    """Url and params of the request for the last `days` of a series"""
+    if kind == 'ohlc':
+        return api_url(f"/coins/{coin_id}/ohlc"), {'vs_currency': 'usd', 'days': days}
+    interval = 'daily' if kind == 'daily' else 'hourly'
+    return api_url(f"/coins/{coin_id}/market_chart"), {'vs_currency': 'usd', 'days': days, 'interval': interval}
+
+
+def delta_days(gran, gap_ms):
+    """Smallest day count whose response still covers gap_ms at the same granularity"""
+    gap_days = (gap_ms + GRANULARITY_STEPS[gran]) / DAY_MS
+    if gran in OHLC_DAYS:
+        for days in OHLC_DAYS[gran]:
+            if days >= gap_days:
+                return days
+        return None
+    # Hourly points are only returned for more than one day
+    return max(2 if gran == 'hourly' else 1, math.ceil(gap_days))
+
+
+def parse_series(kind, data):
+    """Turn an /ohlc or /market_chart response into rows ordered like CANDLE_COLUMNS"""
+    if kind == 'ohlc':
+        return [(int(candle[0]), candle[1], candle[2], candle[3], candle[4], None, None)
+                for candle in data]
+    volumes = {int(ts): value for ts, value in data.get('total_volumes', [])}
+    market_caps = {int(ts): value for ts, value in data.get('market_caps', [])}
+    return [(int(ts), None, None, None, price, volumes.get(int(ts)), market_caps.get(int(ts)))
+            for ts, price in data['prices']]
+
+
+class CandleStore:
+    """Price history kept in SQLite and kept current with delta fetches.
+
+    Rows are keyed by (coin_id, granularity, ts). The first request for a
+    range backfills it; later refreshes only ask for the days since the last
+    stored candle and replace that tail, so a refresh costs about the same
+    whatever the range shown.
+    """
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path or get_db_path()
+        self.init_tables()
+
+    def init_tables(self):
+        """Create the candle and sync bookkeeping tables"""
+        try:
+            conn = get_connection(self.db_path)
+            with conn:
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS candles
+                    (coin_id TEXT NOT NULL,
+                     granularity TEXT NOT NULL,
+                     ts INTEGER NOT NULL,
+                     open REAL,
+                     high REAL,
+                     low REAL,
+                     close REAL,
+                     volume REAL,
+                     market_cap REAL,
+                     PRIMARY KEY (coin_id, granularity, ts)) WITHOUT ROWID
+                ''')
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS candle_sync
+                    (coin_id TEXT NOT NULL,
+                     granularity TEXT NOT NULL,
+                     start_ts INTEGER,
+                     last_ts INTEGER,
+                     synced_at REAL,
+                     PRIMARY KEY (coin_id, granularity))
+                ''')
+        except sqlite3.Error as e:
+            print(f"Error creating candle tables: {e}")
+
+    def _sync_state(self, coin_id, gran):
+        try:
+            return get_connection(self.db_path).execute(
+                "SELECT start_ts, last_ts, synced_at FROM candle_sync WHERE coin_id = ? AND granularity = ?",
+                (coin_id, gran)
+            ).fetchone()
+        except sqlite3.Error as e:
+            print(f"Error reading candle sync state: {e}")
+            return None
+
+    def plan(self, coin_id, kind, days):
+        """Request needed to bring a range up to date as (url, params, backfill), or None if current"""
+        gran = granularity(kind, days)
+        now_ms = int(time.time() * 1000)
+        window_start = now_ms - int(float(days) * DAY_MS)
+        state = self._sync_state(coin_id, gran)
+        if state is None or state[0] > window_start + GRANULARITY_STEPS[gran]:
+            # Nothing stored for (part of) this window yet
+            url, params = series_request(coin_id, kind, days)
+            return url, params, True
+        start_ts, last_ts, synced_at = state
+        if time.time() - synced_at < SYNC_INTERVAL:
+            return None
+        days_needed = delta_days(gran, now_ms - last_ts)
+        if days_needed is None or days_needed >= float(days):
+            url, params = series_request(coin_id, kind, days)
+            return url, params, True
+        url, params = series_request(coin_id, kind, days_needed)
+        return url, params, False
+
+    def merge(self, coin_id, kind, days, data, backfill):
+        """Store a response, replacing every stored row from its first timestamp on"""
+        rows = parse_series(kind, data)
+        if not rows:
+            return
+        gran = granularity(kind, days)
+        now_ms = int(time.time() * 1000)
+        first_ts = min(row[0] for row in rows)
+        last_ts = max(row[0] for row in rows)
+        try:
+            conn = get_connection(self.db_path)
+            with conn:
+                state = conn.execute(
+                    "SELECT start_ts FROM candle_sync WHERE coin_id = ? AND granularity = ?",
+                    (coin_id, gran)
+                ).fetchone()
+                start_ts = now_ms - int(float(days) * DAY_MS) if backfill else first_ts
+                if state is not None and state[0] is not None:
+                    start_ts = min(start_ts, state[0])
+                # The newest stored candle was still forming, the response supersedes it
+                conn.execute(
+                    "DELETE FROM candles WHERE coin_id = ? AND granularity = ? AND ts >= ?",
+                    (coin_id, gran, first_ts)
+                )
+                conn.executemany(
+                    "INSERT OR REPLACE INTO candles VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(coin_id, gran) + row for row in rows]
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO candle_sync VALUES (?, ?, ?, ?, ?)",
+                    (coin_id, gran, start_ts, last_ts, time.time())
+                )
+        except sqlite3.Error as e:
+            print(f"Error storing candles for {coin_id}: {e}")
+
+    def read(self, coin_id, kind, days):
+        """Stored rows of the last `days` of a series, oldest first"""
+        gran = granularity(kind, days)
+        window_start = int(time.time() * 1000) - int(float(days) * DAY_MS)
+        try:
+            return get_connection(self.db_path).execute(
+                f"SELECT {', '.join(CANDLE_COLUMNS)} FROM candles "
+                "WHERE coin_id = ? AND granularity = ? AND ts >= ? ORDER BY ts",
+                (coin_id, gran, window_start)
+            ).fetchall()
+        except sqlite3.Error as e:
+            print(f"Error reading candles for {coin_id}: {e}")
+            return []
+
+    def get_series(self, coin_id, kind, days):
+        """Rows of the last `days` of a series, syncing the store first if it is out of date"""
+        request = self.plan(coin_id, kind, days)
+        if request is not None:
+            url, params, backfill = request
+            try:
+                response = http_get(url, params=params)
+                if response.status_code == 200:
+                    self.merge(coin_id, kind, days, response.json(), backfill)
+                else:
+                    print(f"Failed to fetch price history for {coin_id}: Status {response.status_code}")
+            except Exception as e:
+                # Fall back to whatever is stored
+                print(f"Error fetching price history for {coin_id}: {e}")
+        return self.read(coin_id, kind, days)
+
+    async def get_series_async(self, coin_id, kind, days):
+        """Async get_series for use with coingecko_client.gather()"""
+        request = await asyncio.to_thread(self.plan, coin_id, kind, days)
+        if request is not None:
+            url, params, backfill = request
+            try:
+                response = await async_get(url, params=params)
+                if response.status_code == 200:
+                    await asyncio.to_thread(self.merge, coin_id, kind, days, response.json(), backfill)
+                else:
+                    print(f"Failed to fetch price history for {coin_id}: Status {response.status_code}")
+            except Exception as e:
+                print(f"Error fetching price history for {coin_id}: {e}")
+        return await asyncio.to_thread(self.read, coin_id, kind, days)
+
+
+@shared_resource
+def get_candle_store():
+    """Get the candle store shared by every session of the process"""
+    return CandleStore()
@@ -0,0 +1,202 @@
+import asyncio
+import threading
+
+import httpx
+
+from config import get_api_base_url
+from http_cache import get_http_cache
+from rate_limiter import RateLimitError, get_rate_limiter
+from resources import shared_resource
+from single_flight import SingleFlight, request_key
+
+API_BASE_URL = get_api_base_url()
+
+DEFAULT_HEADERS = {
+    'accept': 'application/json',
+    'User-Agent': 'Mozilla/5.0'
+}
+
+# Keep-alive pool shared by every page, helper and background thread
+POOL_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=60)
+DEFAULT_TIMEOUT = httpx.Timeout(10.0, connect=5.0)
+
+# Times a call answered with 429 is queued again behind the limiter's backoff
+MAX_RETRIES = 3
+
+# Longest a call waits in the rate limit queue before RateLimitError is raised
+RATE_LIMIT_TIMEOUT = 60
+
+
+def _http2_available():
+    """HTTP/2 needs the optional h2 package (pip install httpx[http2])"""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+HTTP2 = _http2_available()
+
+# Identical requests in flight from any session or the async loop share one call
+_single_flight = SingleFlight()
+
+
+def _client_options():
+    # httpx negotiates gzip/deflate and decodes bodies transparently
+    return dict(
+        headers=DEFAULT_HEADERS,
+        limits=POOL_LIMITS,
+        timeout=DEFAULT_TIMEOUT,
+        http2=HTTP2,
+        follow_redirects=True
+    )
+
+
+@shared_resource
+def get_client():
+    """Get the shared connection-pooled HTTP client"""
+    return httpx.Client(**_client_options())
+
+
+def api_url(path):
+    """Build a full CoinGecko API url from a path such as '/coins/list'"""
+    return f"{API_BASE_URL}{path}"
+
+
+def api_path(url):
+    """Path of a CoinGecko API url, or None for other hosts such as the logo CDN"""
+    if url.startswith(API_BASE_URL):
+        return url[len(API_BASE_URL):] or '/'
+    return None
+
+
+def http_get(url, params=None, headers=None, timeout=None, cache=False):
+    """GET a url through the shared client; identical in-flight calls share one request.
+
+    With cache=True the body is kept on disk with its ETag/Last-Modified and
+    later calls send a conditional request, so an unchanged payload comes
+    back as a 304 and is served from the cache.
+    """
+    key = request_key('GET', url, params)
+    if not cache:
+        return _single_flight.do(key, lambda: _rate_limited_get(url, params, headers, timeout))
+
+    http_cache = get_http_cache()
+    entry = http_cache.get(key)
+    if entry is not None and http_cache.is_fresh(entry):
+        return http_cache.response(key, entry)
+
+    def revalidate():
+        request_headers = dict(headers or {})
+        request_headers.update(http_cache.validators(entry))
+        response = _rate_limited_get(url, params, request_headers, timeout)
+        return http_cache.handle(key, entry, response)
+
+    return _single_flight.do(key + ('cached',), revalidate)
+
+
+def _rate_limited_get(url, params=None, headers=None, timeout=None):
+    """GET a url, queued behind the shared rate limiter for CoinGecko API urls"""
+    kwargs = {}
+    if timeout is not None:
+        kwargs['timeout'] = timeout
+    path = api_path(url)
+    if path is None:
+        return get_client().get(url, params=params, headers=headers, **kwargs)
+
+    limiter = get_rate_limiter()
+    for _ in range(MAX_RETRIES + 1):
+        if not limiter.acquire(path, RATE_LIMIT_TIMEOUT):
+            raise RateLimitError(f"Timed out waiting for a rate limit slot for {path}")
+        response = get_client().get(url, params=params, headers=headers, **kwargs)
+        limiter.record_response(response.status_code, response.headers.get('Retry-After'))
+        if response.status_code != 429:
+            break
+    return response
+
+
+# Async path: one event loop thread owns a long-lived AsyncClient so concurrent
+# fetches for a render also reuse connections across reruns.
+class _AsyncRunner:
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.client = None
+        self.thread = threading.Thread(
+            target=self.loop.run_forever, name="coingecko-async", daemon=True
+        )
+        self.thread.start()
+
+    def get_client(self):
+        # Only called from coroutines running on self.loop, so no lock is needed
+        if self.client is None:
+            self.client = httpx.AsyncClient(**_client_options())
+        return self.client
+
+    def run(self, coroutine, timeout=None):
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result(timeout)
+
+
+@shared_resource
+def _get_runner():
+    return _AsyncRunner()
+
+
+async def async_get(url, params=None, headers=None, timeout=None, cache=False):
+    """GET a url through the shared async client; must be awaited via gather().
+
+    See http_get for the meaning of cache.
+    """
+    key = request_key('GET', url, params)
+    if not cache:
+        return await _single_flight.do_async(
+            key, lambda: _rate_limited_async_get(url, params, headers, timeout)
+        )
+
+    http_cache = get_http_cache()
+    entry = http_cache.get(key)
+    if entry is not None and http_cache.is_fresh(entry):
+        return http_cache.response(key, entry)
+
+    async def revalidate():
+        request_headers = dict(headers or {})
+        request_headers.update(http_cache.validators(entry))
+        response = await _rate_limited_async_get(url, params, request_headers, timeout)
+        return http_cache.handle(key, entry, response)
+
+    return await _single_flight.do_async(key + ('cached',), revalidate)
+
+
+async def _rate_limited_async_get(url, params=None, headers=None, timeout=None):
+    kwargs = {}
+    if timeout is not None:
+        kwargs['timeout'] = timeout
+    client = _get_runner().get_client()
+    path = api_path(url)
+    if path is None:
+        return await client.get(url, params=params, headers=headers, **kwargs)
+
+    limiter = get_rate_limiter()
+    for _ in range(MAX_RETRIES + 1):
+        # Wait for the limiter in a worker thread so the event loop keeps running
+        if not await asyncio.to_thread(limiter.acquire, path, RATE_LIMIT_TIMEOUT):
+            raise RateLimitError(f"Timed out waiting for a rate limit slot for {path}")
+        response = await client.get(url, params=params, headers=headers, **kwargs)
+        limiter.record_response(response.status_code, response.headers.get('Retry-After'))
+        if response.status_code != 429:
+            break
+    return response
+
+
+def gather(*coroutines, timeout=None):
+    """Run coroutines concurrently on the shared event loop and return their results.
+
+    Exceptions are returned in place of results so one failed call does not
+    cancel the others.
+    """
+    async def _gather():
+        return await asyncio.gather(*coroutines, return_exceptions=True)
+
+    if not coroutines:
+        return []
+    return _get_runner().run(_gather(), timeout)
@@ -1,6 +1,9 @@
 # config.py
 import os
 
+# Set COINGECKO_API_BASE_URL to point every module at another server, e.g. mock_coingecko.py
+DEFAULT_API_BASE_URL = 'https://api.coingecko.com/api/v3'
+
 def get_project_root():
     """Get the project root directory"""
     return os.path.dirname(os.path.abspath(__file__))
@@ -10,4 +13,14 @@ def get_db_path():
     root_dir = get_project_root()
     data_dir = os.path.join(root_dir, 'data')
     os.makedirs(data_dir, exist_ok=True)
-    return os.path.join(data_dir, 'crypto_transactions.db')
\ No newline at end of file
+    return os.path.join(data_dir, 'crypto_transactions.db')
+
+def get_cache_dir(name):
+    """Get the absolute path of an on-disk cache directory"""
+    cache_dir = os.path.join(get_project_root(), 'data', 'cache', name)
+    os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
+
+def get_api_base_url():
+    """Get the CoinGecko API base url, overridable with COINGECKO_API_BASE_URL"""
+    return os.environ.get('COINGECKO_API_BASE_URL', DEFAULT_API_BASE_URL).rstrip('/')
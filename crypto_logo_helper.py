@@ -1,17 +1,28 @@
+import asyncio
 import json
 from pathlib import Path
-import requests
+import threading
 import time
 import os
 import re
 
+from coingecko_client import API_BASE_URL, http_get
+from resources import shared_resource
+
+# Seconds before a coin whose logo could not be found is looked up again
+LOGO_MISS_TTL = 60 * 60
+
 class CryptoLogoManager:
     def __init__(self):
         self.logos_dir = Path("coin_logos")
         self.metadata_file = self.logos_dir / "top100_metadata.json"
         self.logos_dir.mkdir(exist_ok=True)  # Ensure directory exists
         self.metadata = self._load_metadata()
-        self.api_base_url = "https://api.coingecko.com/api/v3"
+        self._metadata_lock = threading.Lock()  # Lookups may run in parallel threads
+        # Resolved logo paths and failed lookup times by coin string, kept for the manager's lifetime
+        self._logo_paths = {}
+        self._misses = {}
+        self.api_base_url = API_BASE_URL
         self.headers = {
             'accept': 'application/json',
             'User-Agent': 'Mozilla/5.0'
@@ -57,7 +68,7 @@ class CryptoLogoManager:
         """Get coin info from CoinGecko API"""
         try:
             # First try direct symbol lookup
-            response = requests.get(
+            response = http_get(
                 f"{self.api_base_url}/search",
                 params={'query': symbol},
                 headers=self.headers
@@ -84,7 +95,7 @@ class CryptoLogoManager:
     def _fetch_and_save_logo(self, coin_id):
         """Fetch logo from CoinGecko and save locally"""
         try:
-            response = requests.get(
+            response = http_get(
                 f"{self.api_base_url}/coins/{coin_id}",
                 params={
                     'localization': 'false',
@@ -94,7 +105,8 @@ class CryptoLogoManager:
                     'developer_data': 'false',
                     'sparkline': 'false'
                 },
-                headers=self.headers
+                headers=self.headers,
+                cache=True
             )
             
             if response.status_code == 200:
@@ -102,7 +114,7 @@ class CryptoLogoManager:
                 if 'image' in coin_data and 'small' in coin_data['image']:
                     # Download the logo
                     logo_url = coin_data['image']['small']
-                    logo_response = requests.get(logo_url, headers=self.headers)
+                    logo_response = http_get(logo_url, headers=self.headers)
                     
                     if logo_response.status_code == 200:
                         # Determine file extension from content type
@@ -115,12 +127,13 @@ class CryptoLogoManager:
                             f.write(logo_response.content)
                         
                         # Update metadata
-                        self.metadata[coin_id] = {
-                            'name': coin_data['name'],
-                            'symbol': coin_data['symbol'].upper(),
-                            'logo_path': str(logo_path)
-                        }
-                        self._save_metadata()
+                        with self._metadata_lock:
+                            self.metadata[coin_id] = {
+                                'name': coin_data['name'],
+                                'symbol': coin_data['symbol'].upper(),
+                                'logo_path': str(logo_path)
+                            }
+                            self._save_metadata()
                         
                         return str(logo_path)
             
@@ -139,8 +152,39 @@ class CryptoLogoManager:
             return name, old_symbol, current_symbol
         return coin_string.lower(), None, None
 
+    def _local_logo(self, coin_id):
+        """Logo path of a coin already in the metadata, if its file exists"""
+        info = self.metadata.get(coin_id)
+        if not info or not info.get('logo_path'):
+            return None
+        # Paths written on Windows use backslashes
+        logo_path = info['logo_path'].replace('\\', os.sep)
+        return logo_path if os.path.exists(logo_path) else None
+
+    def _find_in_metadata(self, name, symbols):
+        """Coin id of a metadata entry matching the name or one of the symbols"""
+        for coin_id, info in list(self.metadata.items()):
+            if str(info.get('name', '')).lower() == name or str(info.get('symbol', '')).lower() in symbols:
+                return coin_id
+        return None
+
     def get_logo_path(self, coin_string):
-        """Get logo path for a given coin name, fetching from API if needed"""
+        """Get logo path for a given coin name, fetching from API only the first time"""
+        if coin_string in self._logo_paths:
+            return self._logo_paths[coin_string]
+        missed_at = self._misses.get(coin_string)
+        if missed_at is not None and time.monotonic() - missed_at < LOGO_MISS_TTL:
+            return None
+        logo_path = self._resolve_logo_path(coin_string)
+        if logo_path:
+            self._logo_paths[coin_string] = logo_path
+            self._misses.pop(coin_string, None)
+        else:
+            self._misses[coin_string] = time.monotonic()
+        return logo_path
+
+    def _resolve_logo_path(self, coin_string):
+        """Find a coin's logo locally, or through /search and /coins when it is unknown"""
         name, old_symbol, current_symbol = self._extract_name_and_symbol(coin_string)
         
         # Try to get symbol from relationships
@@ -150,26 +194,31 @@ class CryptoLogoManager:
                 coin_id = relationship.get('coingecko_id')
                 if coin_id:
                     # Check if we have it locally
-                    if coin_id in self.metadata:
-                        logo_path = self.metadata[coin_id]['logo_path']
-                        if os.path.exists(logo_path):
-                            return logo_path
+                    logo_path = self._local_logo(coin_id)
+                    if logo_path:
+                        return logo_path
                     
                     # If not found locally, fetch from API
                     logo_path = self._fetch_and_save_logo(coin_id)
                     if logo_path:
                         return logo_path
         
-        # If not in relationships, try to find by symbol
+        # Coins already in the metadata need no search
         search_symbols = [s for s in [current_symbol, old_symbol, name] if s]
+        coin_id = self._find_in_metadata(name, search_symbols)
+        if coin_id:
+            logo_path = self._local_logo(coin_id)
+            if logo_path:
+                return logo_path
+        
+        # If not in relationships, try to find by symbol
         for symbol in search_symbols:
             coin_id = self._get_coin_info(symbol)
             if coin_id:
                 # Check if we have it locally
-                if coin_id in self.metadata:
-                    logo_path = self.metadata[coin_id]['logo_path']
-                    if os.path.exists(logo_path):
-                        return logo_path
+                logo_path = self._local_logo(coin_id)
+                if logo_path:
+                    return logo_path
                 
                 # If not found locally, fetch from API
                 logo_path = self._fetch_and_save_logo(coin_id)
@@ -178,6 +227,11 @@ class CryptoLogoManager:
         
         return None
 
+@shared_resource
+def get_logo_manager():
+    """Get the logo manager shared by every session, so resolved logos are only looked up once"""
+    return CryptoLogoManager()
+
 def get_crypto_logo(coin_name):
     """
     Get logo path for a cryptocurrency, fetching from API if needed.
@@ -186,8 +240,19 @@ def get_crypto_logo(coin_name):
     Returns:
         str: Path to the logo file or None if not found
     """
-    logo_manager = CryptoLogoManager()
-    return logo_manager.get_logo_path(coin_name)
+    return get_logo_manager().get_logo_path(coin_name)
+
+async def get_crypto_logo_async(coin_name, logo_manager=None):
+    """
+    Get logo path in a worker thread so several lookups can run concurrently.
+    Args:
+        coin_name (str): Name or symbol of the cryptocurrency
+        logo_manager (CryptoLogoManager): Manager shared by concurrent lookups
+    Returns:
+        str: Path to the logo file or None if not found
+    """
+    logo_manager = logo_manager or get_logo_manager()
+    return await asyncio.to_thread(logo_manager.get_logo_path, coin_name)
 
 # Example usage
 if __name__ == "__main__":
@@ -0,0 +1,95 @@
+import sqlite3
+import threading
+import weakref
+
+from config import get_db_path
+from resources import shared_resource
+
+# Pragmas every pooled connection is opened with
+PRAGMAS = [
+    ('journal_mode', 'WAL'),         # Readers no longer block the writer, or the other way round
+    ('synchronous', 'NORMAL'),       # Safe with WAL, fsync only happens at checkpoints
+    ('cache_size', -16000),          # 16 MB page cache (negative values are KiB)
+    ('mmap_size', 64 * 1024 * 1024),
+    ('temp_store', 'MEMORY'),
+]
+
+# Seconds a writer waits for a lock before "database is locked" is raised
+BUSY_TIMEOUT = 10
+
+# Prepared statements each connection keeps, keyed by their SQL text
+STATEMENT_CACHE_SIZE = 256
+
+# Connections kept for reuse after the thread that used them has finished
+MAX_IDLE_CONNECTIONS = 8
+
+
+class ConnectionPool:
+    """Per-thread SQLite connections to one database file.
+
+    Each thread gets its own connection, so sessions never share one
+    concurrently. When a thread finishes, for example after a Streamlit
+    script run, its connection goes back to the pool and is reused by the
+    next thread along with its prepared statements.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        # Connections move between threads, but only ever belong to one at a time
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=BUSY_TIMEOUT,
+            check_same_thread=False,
+            cached_statements=STATEMENT_CACHE_SIZE
+        )
+        for name, value in PRAGMAS:
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+    def connection(self):
+        """The calling thread's connection, opening or reusing one if needed"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            with self._lock:
+                conn = self._idle.pop() if self._idle else None
+            if conn is None:
+                conn = self._connect()
+            self._local.conn = conn
+            weakref.finalize(threading.current_thread(), self._release, conn)
+        return conn
+
+    def _release(self, conn):
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            conn.close()
+            return
+        with self._lock:
+            if len(self._idle) < MAX_IDLE_CONNECTIONS:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+
+@shared_resource
+def _get_pool(db_path):
+    return ConnectionPool(db_path)
+
+
+def get_pool(db_path=None):
+    """Get the connection pool of a database file, the app database by default"""
+    return _get_pool(db_path or get_db_path())
+
+
+def get_connection(db_path=None):
+    """Get the calling thread's pooled connection to a database file.
+
+    Don't close it; use ``with conn:`` to commit or roll back a transaction.
+    """
+    return get_pool(db_path).connection()
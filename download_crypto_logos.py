@@ -1,12 +1,13 @@
 import os
-import requests
 import time
 from pathlib import Path
 import json
 
+from coingecko_client import API_BASE_URL, http_get
+
 class CryptoLogoDownloader:
     def __init__(self):
-        self.base_url = "https://api.coingecko.com/api/v3"
+        self.base_url = API_BASE_URL
         self.logos_dir = Path("coin_logos")
         self.metadata_file = self.logos_dir / "top100_metadata.json"
         self.headers = {
@@ -21,7 +22,7 @@ class CryptoLogoDownloader:
     def get_top_100_coins(self):
         """Fetch top 100 coins by market cap from CoinGecko"""
         try:
-            response = requests.get(
+            response = http_get(
                 f"{self.base_url}/coins/markets",
                 params={
                     'vs_currency': 'usd',
@@ -44,7 +45,7 @@ class CryptoLogoDownloader:
     def download_logo(self, url, coin_id):
         """Download logo from URL"""
         try:
-            response = requests.get(url, headers=self.headers)
+            response = http_get(url, headers=self.headers)
             if response.status_code == 200:
                 # Get file extension from content type
                 content_type = response.headers.get('content-type', '')
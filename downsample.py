@@ -0,0 +1,93 @@
+import numpy as np
+
+
+def bucket_starts(n, buckets):
+    """Start index of each of `buckets` near-equal consecutive buckets over n points"""
+    return np.unique(np.linspace(0, n, buckets, endpoint=False).astype(np.int64))
+
+
+def lttb_indices(x, y, threshold):
+    """Indices of the points Largest-Triangle-Three-Buckets keeps out of a line.
+
+    The first and last points are always kept; every bucket in between
+    keeps the point forming the largest triangle with the previously kept
+    point and the average of the next bucket, which preserves peaks and
+    troughs far better than taking every k-th point.
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    # Bucket boundaries for the points between the first and the last
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_x = x[end:edges[i + 2]].mean()
+            next_y = y[end:edges[i + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+        areas = np.abs((x[a] - next_x) * (y[start:end] - y[a])
+                       - (x[a] - x[start:end]) * (next_y - y[a]))
+        a = start + int(np.argmax(areas))
+        selected[i + 1] = a
+    return selected
+
+
+def downsample_line(x, y, max_points):
+    """Reduce a line to at most max_points with LTTB"""
+    x = np.asarray(x)
+    y = np.asarray(y, dtype=float)
+    if len(y) <= max_points:
+        return x, y
+    # datetime64 x values are compared as integers
+    numeric_x = x.astype(np.int64) if np.issubdtype(x.dtype, np.datetime64) else x
+    keep = lttb_indices(numeric_x, y, max_points)
+    return x[keep], y[keep]
+
+
+def downsample_ohlc(x, ohlc, max_candles):
+    """Merge consecutive candles into at most max_candles, keeping first open, max high, min low and last close"""
+    x = np.asarray(x)
+    ohlc = np.asarray(ohlc, dtype=float)
+    n = len(ohlc)
+    if n <= max_candles:
+        return x, ohlc
+    starts = bucket_starts(n, max_candles)
+    ends = np.append(starts[1:], n) - 1
+    merged = np.column_stack([
+        ohlc[starts, 0],
+        np.maximum.reduceat(ohlc[:, 1], starts),
+        np.minimum.reduceat(ohlc[:, 2], starts),
+        ohlc[ends, 3],
+    ])
+    return x[starts], merged
+
+
+def downsample_sum(x, values, max_points):
+    """Sum consecutive values into at most max_points buckets, e.g. for volume bars"""
+    x = np.asarray(x)
+    values = np.asarray(values, dtype=float)
+    if len(values) <= max_points:
+        return x, values
+    starts = bucket_starts(len(values), max_points)
+    return x[starts], np.add.reduceat(values, starts)
+
+
+def downsample(dates, prices, max_points):
+    """Reduce a price history to a drawable number of points.
+
+    Lines are reduced with LTTB and OHLC rows with min/max bucketing.
+    Returns datetime64 dates and float prices as NumPy arrays.
+    """
+    x = np.asarray(dates, dtype='datetime64[ms]')
+    y = np.asarray(prices, dtype=float)
+    if y.ndim == 2:
+        return downsample_ohlc(x, y, max_points)
+    return downsample_line(x, y, max_points)
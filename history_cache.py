@@ -0,0 +1,68 @@
+import threading
+
+from cachetools import TLRUCache
+
+from resources import shared_resource
+
+# Parsed histories kept in memory, least recently used are evicted first
+HISTORY_CACHE_SIZE = 512
+
+# (max days, seconds a history stays valid) by the granularity CoinGecko returns.
+# The newest candle or point keeps moving, so short ranges expire sooner.
+CANDLE_TTLS = [
+    (2, 30 * 60),       # 30-minute candles
+    (30, 60 * 60),      # 4-hour candles
+]
+LONG_CANDLE_TTL = 4 * 60 * 60  # 4-day candles
+DAILY_TTLS = [
+    (90, 60 * 60),
+]
+LONG_DAILY_TTL = 4 * 60 * 60
+
+
+def history_ttl(days, kind):
+    """Seconds a history of a candle store series kind ('ohlc', 'daily', ...) stays valid"""
+    if kind == 'ohlc':
+        ttls, long_ttl = CANDLE_TTLS, LONG_CANDLE_TTL
+    else:
+        ttls, long_ttl = DAILY_TTLS, LONG_DAILY_TTL
+    for max_days, ttl in ttls:
+        if int(days) <= max_days:
+            return ttl
+    return long_ttl
+
+
+class HistoryCache:
+    """Parsed price histories keyed by (coin_id, days, kind).
+
+    Entries expire after ``history_ttl`` and the cache holds at most
+    ``maxsize`` of them, so repeated renders reuse parsed data without
+    growing without bound. Cached values are shared, treat them as read-only.
+    """
+
+    def __init__(self, maxsize=HISTORY_CACHE_SIZE):
+        self._cache = TLRUCache(maxsize=maxsize, ttu=self._expires_at)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _expires_at(key, value, now):
+        _, days, kind = key
+        return now + history_ttl(days, kind)
+
+    def get(self, coin_id, days, kind):
+        """Cached history of a coin, or None if missing or expired"""
+        with self._lock:
+            return self._cache.get((coin_id, str(days), kind))
+
+    def put(self, coin_id, days, kind, history):
+        """Cache a history; empty histories are not kept"""
+        if not len(history):
+            return
+        with self._lock:
+            self._cache[(coin_id, str(days), kind)] = history
+
+
+@shared_resource
+def get_history_cache():
+    """Get the history cache shared by every session of the process"""
+    return HistoryCache()
@@ -0,0 +1,83 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from candle_store import get_candle_store
+from coingecko_client import api_path
+from history_cache import get_history_cache
+from price_history import PriceHistory
+from rate_limiter import get_rate_limiter
+from resources import shared_resource
+
+PREFETCH_WORKERS = 2
+
+# Calls left in the rate limit budget for interactive requests
+PREFETCH_RESERVE = 5
+
+# Seconds between budget checks, and how long a prefetch waits for budget before giving up
+PREFETCH_POLL = 1.0
+PREFETCH_TIMEOUT = 120
+
+
+class HistoryPrefetcher:
+    """Loads price histories the user has not asked for yet into the history cache.
+
+    Work runs on a small thread pool and a fetch only starts when the rate
+    limiter has more than PREFETCH_RESERVE calls to spare, so prefetching
+    never delays requests made by a page render.
+    """
+
+    def __init__(self, max_workers=PREFETCH_WORKERS, reserve=PREFETCH_RESERVE):
+        self.reserve = reserve
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='history-prefetch')
+        self._pending = set()
+        self._lock = threading.Lock()
+
+    def prefetch(self, coin_ids, ranges, kind):
+        """Queue every (coin, range) history that is neither cached nor already queued"""
+        history_cache = get_history_cache()
+        for days in ranges:
+            for coin_id in coin_ids:
+                key = (coin_id, str(days), kind)
+                if history_cache.get(*key) is not None:
+                    continue
+                with self._lock:
+                    if key in self._pending:
+                        continue
+                    self._pending.add(key)
+                self._executor.submit(self._load, *key)
+
+    def pending(self):
+        with self._lock:
+            return len(self._pending)
+
+    def _wait_for_budget(self, path):
+        limiter = get_rate_limiter()
+        deadline = time.monotonic() + PREFETCH_TIMEOUT
+        while limiter.headroom(path) < self.reserve + 1:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(PREFETCH_POLL)
+        return True
+
+    def _load(self, coin_id, days, kind):
+        try:
+            candle_store = get_candle_store()
+            request = candle_store.plan(coin_id, kind, days)
+            if request is not None and not self._wait_for_budget(api_path(request[0]) or '/'):
+                print(f"Skipped prefetching {coin_id} {days}d, no spare rate limit budget")
+                return
+            rows = candle_store.get_series(coin_id, kind, days)
+            if rows:
+                get_history_cache().put(coin_id, days, kind, PriceHistory.from_rows(rows))
+        except Exception as e:
+            print(f"Error prefetching price history for {coin_id}: {e}")
+        finally:
+            with self._lock:
+                self._pending.discard((coin_id, days, kind))
+
+
+@shared_resource
+def get_history_prefetcher():
+    """Get the prefetcher shared by every session of the process"""
+    return HistoryPrefetcher()
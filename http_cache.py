@@ -0,0 +1,176 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from config import get_cache_dir
+from resources import shared_resource
+
+# Parsed JSON bodies kept in memory so a 304 costs no parsing either
+PARSED_CACHE_SIZE = 256
+
+MAX_AGE_PATTERN = re.compile(r'max-age=(\d+)')
+
+
+class CachedResponse:
+    """Response served from the HTTP cache.
+
+    Mirrors the parts of httpx.Response the app uses. ``json()`` returns a
+    body parsed once and shared between callers, so treat it as read-only.
+    """
+
+    from_cache = True
+
+    def __init__(self, status_code, headers, load, parse):
+        self.status_code = status_code
+        self.headers = headers
+        self._load = load
+        self._parse = parse
+
+    @property
+    def content(self):
+        return self._load()
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8', errors='replace')
+
+    def json(self):
+        return self._parse()
+
+
+class HttpCache:
+    """On-disk cache of GET response bodies with their ETag/Last-Modified validators"""
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir or get_cache_dir('http')
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._parsed = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _paths(self, key):
+        name = hashlib.sha256(repr(key).encode()).hexdigest()
+        base = os.path.join(self.cache_dir, name)
+        return base + '.json', base + '.body'
+
+    def get(self, key):
+        """Cached entry metadata for a request key, or None"""
+        meta_path, body_path = self._paths(key)
+        try:
+            with open(meta_path, 'r') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not os.path.exists(body_path):
+            return None
+        return entry
+
+    def is_fresh(self, entry):
+        """True while the server's Cache-Control max-age has not expired"""
+        return time.time() - entry['stored_at'] < entry.get('max_age', 0)
+
+    def validators(self, entry):
+        """Conditional request headers for revalidating an entry"""
+        headers = {}
+        if entry and entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def store(self, key, response):
+        """Save a 200 response that carries validators or a max-age"""
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        max_age = parse_max_age(response.headers.get('Cache-Control'))
+        if response.status_code != 200 or not (etag or last_modified or max_age):
+            return None
+        entry = {
+            'etag': etag,
+            'last_modified': last_modified,
+            'max_age': max_age,
+            'content_type': response.headers.get('Content-Type', ''),
+            'stored_at': time.time(),
+            'digest': hashlib.sha256(response.content).hexdigest(),
+        }
+        meta_path, body_path = self._paths(key)
+        try:
+            _atomic_write(body_path, response.content, 'wb')
+            _atomic_write(meta_path, json.dumps(entry), 'w')
+        except OSError as e:
+            print(f"Error writing HTTP cache: {e}")
+            return None
+        return entry
+
+    def touch(self, key, entry, response):
+        """Record a 304 revalidation, picking up any new max-age"""
+        entry = dict(entry)
+        entry['stored_at'] = time.time()
+        max_age = parse_max_age(response.headers.get('Cache-Control'))
+        if max_age:
+            entry['max_age'] = max_age
+        meta_path, _ = self._paths(key)
+        try:
+            _atomic_write(meta_path, json.dumps(entry), 'w')
+        except OSError as e:
+            print(f"Error writing HTTP cache: {e}")
+        return entry
+
+    def response(self, key, entry):
+        """Build a CachedResponse for an entry, parsing its body at most once"""
+        _, body_path = self._paths(key)
+
+        def load():
+            with open(body_path, 'rb') as f:
+                return f.read()
+
+        headers = {'Content-Type': entry.get('content_type', '')}
+        if entry.get('etag'):
+            headers['ETag'] = entry['etag']
+
+        def parse():
+            memo_key = (key, entry['digest'])
+            with self._lock:
+                if memo_key in self._parsed:
+                    self._parsed.move_to_end(memo_key)
+                    return self._parsed[memo_key]
+            parsed = json.loads(load())
+            with self._lock:
+                self._parsed[memo_key] = parsed
+                while len(self._parsed) > PARSED_CACHE_SIZE:
+                    self._parsed.popitem(last=False)
+            return parsed
+
+        return CachedResponse(200, headers, load, parse)
+
+    def handle(self, key, entry, response):
+        """Turn the answer to a (conditional) request into the response callers see"""
+        if response.status_code == 304 and entry is not None:
+            return self.response(key, self.touch(key, entry, response))
+        if response.status_code == 200:
+            self.store(key, response)
+        return response
+
+
+def parse_max_age(cache_control):
+    """max-age seconds from a Cache-Control header, 0 if absent or no-cache"""
+    if not cache_control or 'no-cache' in cache_control or 'no-store' in cache_control:
+        return 0
+    match = MAX_AGE_PATTERN.search(cache_control)
+    return int(match.group(1)) if match else 0
+
+
+def _atomic_write(path, data, mode):
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, mode) as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+@shared_resource
+def get_http_cache():
+    """Get the HTTP cache shared by the whole process"""
+    return HttpCache()
@@ -0,0 +1,78 @@
+from database import get_connection
+from transactions_db import COLUMN_NAMES
+
+# Display columns an edit may change, with the database column each one is stored in
+EDITABLE_COLUMNS = {
+    'Date': 'date',
+    'Quantity': 'quantity',
+    'Purchase Price': 'purchase_price',
+    'Total Cash Invested': 'total_cash_invested',
+    'Current Price': 'current_price',
+    'Profit/Loss': 'profit_loss',
+}
+
+
+class Ledger:
+    """Transactions DataFrame kept in step with the transactions table.
+
+    Every change is written to SQLite first and then applied to the frame in
+    place, touching only the rows concerned, so callers holding the frame
+    see it without the table being read back. The frame keeps a 0..n-1
+    index ordered by id. Methods raise sqlite3.Error when the write fails,
+    in which case the frame is left as it was.
+    """
+
+    def __init__(self, frame, db_path=None):
+        self.frame = frame
+        self.db_path = db_path
+
+    def _rows(self, transaction_id):
+        return self.frame.index[self.frame['id'] == transaction_id]
+
+    def insert(self, transaction_data):
+        """Add a transaction given by display column names and return its id"""
+        columns = [column for column in COLUMN_NAMES if column != 'id']
+        conn = get_connection(self.db_path)
+        with conn:
+            cursor = conn.execute(
+                f"INSERT INTO transactions ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                [transaction_data[COLUMN_NAMES[column]] for column in columns]
+            )
+        row = dict(transaction_data, id=cursor.lastrowid)
+        was_empty = self.frame.empty
+        self.frame.loc[len(self.frame)] = [row[column] for column in self.frame.columns]
+        if was_empty:
+            # Columns of an empty frame are object dtype, give them the row's types
+            for column in self.frame.columns:
+                self.frame[column] = self.frame[column].infer_objects()
+        return cursor.lastrowid
+
+    def update(self, transaction_id, updated_data):
+        """Change the editable fields of one transaction"""
+        updates = {key: value for key, value in updated_data.items() if key in EDITABLE_COLUMNS}
+        if not updates:
+            return
+        conn = get_connection(self.db_path)
+        with conn:
+            conn.execute(
+                f"UPDATE transactions SET {', '.join(f'{EDITABLE_COLUMNS[key]} = ?' for key in updates)} WHERE id = ?",
+                list(updates.values()) + [transaction_id]
+            )
+        rows = self._rows(transaction_id)
+        if len(rows):
+            self.frame.loc[rows, list(updates)] = list(updates.values())
+
+    def delete(self, transaction_id):
+        """Remove one transaction"""
+        conn = get_connection(self.db_path)
+        with conn:
+            conn.execute("DELETE FROM transactions WHERE id = ?", (transaction_id,))
+        self.frame.drop(index=self._rows(transaction_id), inplace=True)
+        self.frame.reset_index(drop=True, inplace=True)
+
+    def clear(self):
+        """Remove every transaction"""
+        conn = get_connection(self.db_path)
+        with conn:
+            conn.execute("DELETE FROM transactions")
+        self.frame.drop(index=self.frame.index, inplace=True)
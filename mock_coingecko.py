@@ -0,0 +1,352 @@
+"""Local stand-in for the CoinGecko API, for offline and repeatable perf runs.
+
+Modes:
+    synthetic  deterministic generated data for the coins in coin_logos/top100_metadata.json
+    record     proxy to the real API once and store every response in a cassette file
+    replay     serve responses from a cassette, falling back to synthetic data if asked
+
+Point the app at it with:
+    python mock_coingecko.py --port 8765 --latency 50 --error-rate 0.05
+    COINGECKO_API_BASE_URL=http://127.0.0.1:8765/api/v3 streamlit run Home.py
+"""
+import argparse
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from config import DEFAULT_API_BASE_URL
+
+API_PREFIX = "/api/v3"
+LOGOS_DIR = Path(__file__).resolve().parent / "coin_logos"
+METADATA_FILE = LOGOS_DIR / "top100_metadata.json"
+
+HOUR_MS = 3600 * 1000
+DAY_MS = 24 * HOUR_MS
+
+
+class SyntheticMarket:
+    """Deterministic prices for a fixed set of coins, consistent across endpoints"""
+
+    def __init__(self, metadata_file=METADATA_FILE, seed=0):
+        self.seed = seed
+        self.coins = self._load_coins(metadata_file)
+
+    def _load_coins(self, metadata_file):
+        try:
+            with open(metadata_file, 'r') as f:
+                metadata = json.load(f)
+        except Exception as e:
+            print(f"Error loading metadata: {e}")
+            metadata = {}
+        if not metadata:
+            metadata = {
+                'bitcoin': {'name': 'Bitcoin', 'symbol': 'BTC', 'current_price': 97000,
+                            'market_cap': 1.9e12, 'total_volume': 1.7e11},
+                'ethereum': {'name': 'Ethereum', 'symbol': 'ETH', 'current_price': 3800,
+                             'market_cap': 4.6e11, 'total_volume': 5.7e10},
+            }
+        coins = {}
+        for rank, (coin_id, coin) in enumerate(metadata.items(), start=1):
+            coins[coin_id] = {
+                'id': coin_id,
+                'name': coin['name'],
+                'symbol': coin['symbol'].lower(),
+                'base_price': coin.get('current_price') or 1.0,
+                'market_cap': coin.get('market_cap') or 1e9,
+                'total_volume': coin.get('total_volume') or 1e8,
+                'market_cap_rank': coin.get('market_cap_rank') or rank,
+            }
+        return coins
+
+    def _phase(self, coin_id, salt):
+        digest = hashlib.sha256(f"{self.seed}:{coin_id}:{salt}".encode()).digest()
+        return int.from_bytes(digest[:8], 'big') / 2 ** 64 * 2 * math.pi
+
+    def price(self, coin_id, timestamp_ms):
+        """Price of a coin at a timestamp, a smooth mix of slow and fast cycles"""
+        coin = self.coins[coin_id]
+        days = timestamp_ms / DAY_MS
+        drift = (0.25 * math.sin(2 * math.pi * days / 45 + self._phase(coin_id, 'slow'))
+                 + 0.06 * math.sin(2 * math.pi * days / 4 + self._phase(coin_id, 'fast'))
+                 + 0.015 * math.sin(2 * math.pi * days * 3 + self._phase(coin_id, 'noise')))
+        return coin['base_price'] * math.exp(drift)
+
+    def series(self, coin_id, days, step_ms, now_ms=None):
+        now_ms = now_ms or int(time.time() * 1000)
+        start_ms = now_ms - int(float(days) * DAY_MS)
+        first = start_ms - start_ms % step_ms + step_ms
+        timestamps = list(range(first, now_ms, step_ms)) + [now_ms]
+        return [(ts, self.price(coin_id, ts)) for ts in timestamps]
+
+    def market_chart(self, coin_id, days, interval=None):
+        days = 365 * 10 if days == 'max' else float(days)
+        if interval == 'daily' or days > 90:
+            step_ms = DAY_MS
+        elif days > 1 or interval == 'hourly':
+            step_ms = HOUR_MS
+        else:
+            step_ms = 5 * 60 * 1000
+        coin = self.coins[coin_id]
+        points = self.series(coin_id, days, step_ms)
+        ratio = coin['market_cap'] / coin['base_price']
+        return {
+            'prices': [[ts, price] for ts, price in points],
+            'market_caps': [[ts, price * ratio] for ts, price in points],
+            'total_volumes': [[ts, coin['total_volume'] * (1 + 0.3 * math.sin(ts / DAY_MS))]
+                              for ts, _ in points],
+        }
+
+    def ohlc(self, coin_id, days):
+        days = 365 * 10 if days == 'max' else float(days)
+        # Same candle sizes as CoinGecko: 30 minutes, 4 hours or 4 days
+        if days <= 2:
+            candle_ms = HOUR_MS // 2
+        elif days <= 30:
+            candle_ms = 4 * HOUR_MS
+        else:
+            candle_ms = 4 * DAY_MS
+        candles = []
+        closes = self.series(coin_id, days, candle_ms)
+        for ts, close in closes:
+            samples = [self.price(coin_id, ts - candle_ms + i * candle_ms // 4) for i in range(4)] + [close]
+            candles.append([ts, samples[0], max(samples), min(samples), close])
+        return candles
+
+
+class MockCoinGeckoHandler(BaseHTTPRequestHandler):
+    server_version = "MockCoinGecko/1.0"
+    protocol_version = "HTTP/1.1"  # Keep-alive, so client connection pooling is exercised
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def do_GET(self):
+        server = self.server
+        split = urlsplit(self.path)
+        params = dict(parse_qsl(split.query))
+
+        if server.latency:
+            time.sleep((server.latency + server.random.uniform(0, server.jitter)) / 1000)
+
+        # Logos stand in for the image CDN, which is not rate limited
+        if split.path.startswith('/images/'):
+            return self._send_image(split.path[len('/images/'):])
+
+        if server.error_rate and server.random.random() < server.error_rate:
+            return self._send_json(429, {'status': {'error_code': 429, 'error_message': 'Rate limited'}},
+                                   {'Retry-After': str(server.retry_after)})
+
+        if not split.path.startswith(API_PREFIX):
+            return self._send_json(404, {'error': 'Not found'})
+        path = split.path[len(API_PREFIX):] or '/'
+        key = cassette_key(path, params)
+
+        if server.mode == 'record':
+            status, body, headers = server.record(path, params, key)
+            return self._send_json(status, body, headers)
+
+        if server.mode == 'replay':
+            entry = server.cassette.get(key)
+            if entry is not None:
+                return self._send_json(entry['status'], entry['body'], entry.get('headers'))
+            if not server.fallback:
+                return self._send_json(404, {'error': f'No recorded response for {key}'})
+
+        status, body = self._synthetic(path, params)
+        return self._send_json(status, body)
+
+    def _synthetic(self, path, params):
+        market = self.server.market
+        parts = [part for part in path.split('/') if part]
+
+        if parts == ['ping']:
+            return 200, {'gecko_says': '(V3) To the Moon!'}
+        if parts == ['coins', 'list']:
+            return 200, [{'id': c['id'], 'symbol': c['symbol'], 'name': c['name']}
+                         for c in market.coins.values()]
+        if parts == ['simple', 'price']:
+            now_ms = int(time.time() * 1000)
+            ids = [coin_id for coin_id in params.get('ids', '').split(',') if coin_id in market.coins]
+            return 200, {coin_id: {'usd': market.price(coin_id, now_ms)} for coin_id in ids}
+        if parts == ['search']:
+            query = params.get('query', '').lower()
+            matches = [c for c in market.coins.values()
+                       if query and (query in c['id'] or query in c['symbol'] or query in c['name'].lower())]
+            matches.sort(key=lambda c: (c['symbol'] != query, c['market_cap_rank']))
+            return 200, {'coins': [{'id': c['id'], 'name': c['name'], 'api_symbol': c['id'],
+                                    'symbol': c['symbol'].upper(), 'market_cap_rank': c['market_cap_rank'],
+                                    'thumb': self._image_url(c['id']), 'large': self._image_url(c['id'])}
+                                   for c in matches[:25]]}
+        if parts == ['coins', 'markets']:
+            now_ms = int(time.time() * 1000)
+            per_page = int(params.get('per_page', 100))
+            page = int(params.get('page', 1))
+            coins = sorted(market.coins.values(), key=lambda c: c['market_cap_rank'])
+            coins = coins[(page - 1) * per_page:page * per_page]
+            return 200, [{'id': c['id'], 'symbol': c['symbol'], 'name': c['name'],
+                          'image': self._image_url(c['id']),
+                          'current_price': market.price(c['id'], now_ms),
+                          'market_cap': c['market_cap'], 'market_cap_rank': c['market_cap_rank'],
+                          'total_volume': c['total_volume']}
+                         for c in coins]
+
+        if len(parts) >= 2 and parts[0] == 'coins':
+            coin_id = parts[1]
+            if coin_id not in market.coins:
+                return 404, {'error': 'coin not found'}
+            coin = market.coins[coin_id]
+            if len(parts) == 2:
+                image = self._image_url(coin_id)
+                return 200, {'id': coin_id, 'symbol': coin['symbol'], 'name': coin['name'],
+                             'image': {'thumb': image, 'small': image, 'large': image}}
+            if parts[2:] == ['market_chart']:
+                return 200, market.market_chart(coin_id, params.get('days', '1'), params.get('interval'))
+            if parts[2:] == ['ohlc']:
+                return 200, market.ohlc(coin_id, params.get('days', '1'))
+
+        return 404, {'error': f'Unknown endpoint {path}'}
+
+    def _image_url(self, coin_id):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/images/{coin_id}"
+
+    def _send_image(self, coin_id):
+        for ext, content_type in (('.png', 'image/png'), ('.jpg', 'image/jpeg')):
+            logo_path = LOGOS_DIR / f"{coin_id}{ext}"
+            if logo_path.exists():
+                body = logo_path.read_bytes()
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+        self._send_json(404, {'error': 'image not found'})
+
+    def _send_json(self, status, body, headers=None):
+        payload = json.dumps(body).encode()
+        if status == 200:
+            # Validators let clients revalidate with If-None-Match and get a 304
+            etag = '"%s"' % hashlib.sha1(payload).hexdigest()
+            if self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            headers = dict(headers or {}, ETag=etag)
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+def cassette_key(path, params):
+    """Key of a recorded response, independent of query parameter order"""
+    query = urlencode(sorted(params.items()))
+    return f"GET {path}?{query}" if query else f"GET {path}"
+
+
+class MockCoinGeckoServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, mode='synthetic', cassette_file=None, upstream=DEFAULT_API_BASE_URL,
+                 fallback=True, latency=0, jitter=0, error_rate=0.0, retry_after=1, seed=0, verbose=False):
+        super().__init__(address, MockCoinGeckoHandler)
+        self.mode = mode
+        self.cassette_file = Path(cassette_file) if cassette_file else None
+        self.upstream = upstream.rstrip('/')
+        self.fallback = fallback
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.market = SyntheticMarket(seed=seed)
+        self.verbose = verbose
+        self.cassette = self._load_cassette()
+        self._cassette_lock = threading.Lock()
+
+    def _load_cassette(self):
+        if self.cassette_file and self.cassette_file.exists():
+            with open(self.cassette_file, 'r') as f:
+                return json.load(f)
+        return {}
+
+    def record(self, path, params, key):
+        """Fetch a response from the real API and store it in the cassette"""
+        import httpx
+
+        response = httpx.get(f"{self.upstream}{path}", params=params,
+                             headers={'accept': 'application/json', 'User-Agent': 'Mozilla/5.0'},
+                             timeout=30)
+        try:
+            body = response.json()
+        except ValueError:
+            body = {'error': response.text}
+        headers = {}
+        if 'Retry-After' in response.headers:
+            headers['Retry-After'] = response.headers['Retry-After']
+        if response.status_code == 200:
+            with self._cassette_lock:
+                self.cassette[key] = {'status': response.status_code, 'body': body}
+                if self.cassette_file:
+                    with open(self.cassette_file, 'w') as f:
+                        json.dump(self.cassette, f)
+        return response.status_code, body, headers
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local CoinGecko stand-in server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--mode', choices=['synthetic', 'record', 'replay'], default='synthetic')
+    parser.add_argument('--cassette', help="JSON file to record responses to or replay them from")
+    parser.add_argument('--upstream', default=DEFAULT_API_BASE_URL, help="API to record from")
+    parser.add_argument('--no-fallback', action='store_true',
+                        help="In replay mode, answer 404 instead of synthetic data for unrecorded requests")
+    parser.add_argument('--latency', type=float, default=0, help="Added latency per request in ms")
+    parser.add_argument('--jitter', type=float, default=0, help="Random extra latency up to this many ms")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument('--retry-after', type=int, default=1, help="Retry-After seconds sent with injected 429s")
+    parser.add_argument('--seed', type=int, default=0, help="Seed for synthetic prices and injected errors")
+    parser.add_argument('--verbose', action='store_true', help="Log every request")
+    args = parser.parse_args()
+
+    if args.mode in ('record', 'replay') and not args.cassette:
+        parser.error(f"--cassette is required in {args.mode} mode")
+
+    server = MockCoinGeckoServer(
+        (args.host, args.port),
+        mode=args.mode,
+        cassette_file=args.cassette,
+        upstream=args.upstream,
+        fallback=not args.no_fallback,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        retry_after=args.retry_after,
+        seed=args.seed,
+        verbose=args.verbose
+    )
+    print(f"Mock CoinGecko API ({args.mode}) at http://{args.host}:{args.port}{API_PREFIX}")
+    print(f"Use it with: COINGECKO_API_BASE_URL=http://{args.host}:{args.port}{API_PREFIX}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,15 @@
 import streamlit as st
 import pandas as pd
-import requests
 from datetime import datetime, timedelta
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import time
 from config import get_db_path
+from candle_store import CANDLE_COLUMNS, get_candle_store
+from database import get_connection
+from coingecko_client import api_url, http_get
+from downsample import downsample_line, downsample_ohlc, downsample_sum
+from transactions_db import migrate_transactions
 import sqlite3
 # Page configuration
 st.set_page_config(layout="wide", page_title="Crypto Analysis")
@@ -67,7 +71,7 @@ st.markdown("""
 def fetch_available_coins():
     """Fetch list of available cryptocurrencies from CoinGecko"""
     try:
-        response = requests.get('https://api.coingecko.com/api/v3/coins/list')
+        response = http_get(api_url('/coins/list'), cache=True)
         if response.status_code == 200:
             coins = response.json()
             return {f"{coin['name']} ({coin['symbol'].upper()})": coin['id'] for coin in coins}
@@ -81,22 +85,13 @@ def fetch_available_coins():
 def get_historical_crypto_data(coin_id, days=365):
     """Fetch historical price data from CoinGecko with proper hourly granularity"""
     try:
-        url = f'https://api.coingecko.com/api/v3/coins/{coin_id}/market_chart'
-        params = {
-            'vs_currency': 'usd',
-            'days': min(days, 90),  # Limit to 90 days for hourly data
-            'interval': 'hourly'    # Always request hourly data for shorter periods
-        }
-        
-        response = requests.get(url, params=params)
+        # Limit to 90 days for hourly data
+        rows = get_candle_store().get_series(coin_id, 'hourly', min(days, 90))
         
-        if response.status_code == 200:
-            data = response.json()
-            
+        if rows:
             # Create DataFrame with timestamp as index
-            df = pd.DataFrame(data['prices'], columns=['timestamp', 'close'])
-            df['volume'] = pd.DataFrame(data['total_volumes'])[1]
-            df['market_cap'] = pd.DataFrame(data['market_caps'])[1]
+            df = pd.DataFrame(rows, columns=CANDLE_COLUMNS)[['ts', 'close', 'volume', 'market_cap']]
+            df = df.rename(columns={'ts': 'timestamp'})
             df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
             df.set_index('timestamp', inplace=True)
             
@@ -116,6 +111,9 @@ def get_historical_crypto_data(coin_id, days=365):
 
 
 
+# Most candles, bars or line points drawn across the price chart
+PRICE_CHART_POINTS = 300
+
 def create_price_chart(df, coin_name):
     """Create an interactive candlestick chart using Plotly"""
     # First create OHLC data
@@ -130,6 +128,17 @@ def create_price_chart(df, coin_name):
     volume_data = df['volume'].resample('D').sum()
     market_cap_data = df['market_cap'].resample('D').last()
     
+    # Don't send more points than the chart is wide enough to show
+    if len(ohlc_data) > PRICE_CHART_POINTS:
+        columns = ['open', 'high', 'low', 'close']
+        dates, ohlc = downsample_ohlc(ohlc_data.index.values, ohlc_data[columns].to_numpy(), PRICE_CHART_POINTS)
+        ohlc_data = pd.DataFrame(ohlc, index=dates, columns=columns)
+        dates, volumes = downsample_sum(volume_data.index.values, volume_data.to_numpy(), PRICE_CHART_POINTS)
+        volume_data = pd.Series(volumes, index=dates)
+    if len(market_cap_data) > PRICE_CHART_POINTS:
+        dates, market_caps = downsample_line(market_cap_data.index.values, market_cap_data.to_numpy(), PRICE_CHART_POINTS)
+        market_cap_data = pd.Series(market_caps, index=dates)
+    
     fig = make_subplots(rows=3, cols=1, 
                        shared_xaxes=True,
                        vertical_spacing=0.05,
@@ -373,34 +382,29 @@ def display_historical_data(df):
 def init_database():
     """Initialize SQLite database and create table if it doesn't exist"""
     try:
-        db_path = get_db_path()
-        conn = sqlite3.connect(db_path)
-        c = conn.cursor()
-        c.execute('''
-            CREATE TABLE IF NOT EXISTS transactions
-            (id INTEGER PRIMARY KEY AUTOINCREMENT,
-             date TEXT, 
-             asset TEXT,
-             symbol TEXT,
-             quantity REAL,
-             purchase_price REAL,
-             total_cash_invested REAL,
-             current_price REAL,
-             profit_loss REAL)
-        ''')
-        conn.commit()
+        conn = get_connection(get_db_path())
+        with conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS transactions
+                (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                 date TEXT, 
+                 asset TEXT,
+                 symbol TEXT,
+                 quantity REAL,
+                 purchase_price REAL,
+                 total_cash_invested REAL,
+                 current_price REAL,
+                 profit_loss REAL)
+            ''')
+        migrate_transactions(get_db_path())
     except sqlite3.Error as e:
         st.error(f"Database error: {e}")
-    finally:
-        conn.close()
 
 def load_transactions():
     """Load all transactions from the database"""
     try:
-        db_path = get_db_path()
-        conn = sqlite3.connect(db_path)
+        conn = get_connection(get_db_path())
         df = pd.read_sql_query("SELECT * FROM transactions", conn)
-        conn.close()
         return df
     except sqlite3.Error as e:
         st.error(f"Error loading transactions: {e}")
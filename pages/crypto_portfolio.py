@@ -1,7 +1,6 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime, timedelta
-import requests
 import time
 import sqlite3
 import os
@@ -12,7 +11,19 @@ import re
 from datetime import datetime, timedelta
 import plotly.graph_objs as go
 
-from crypto_logo_helper import get_crypto_logo
+from crypto_logo_helper import get_crypto_logo_async, get_logo_manager
+from database import get_connection
+from downsample import downsample
+from candle_store import get_candle_store
+from coingecko_client import api_url, gather, http_get
+from history_cache import get_history_cache
+from history_prefetch import get_history_prefetcher
+from price_history import PriceHistory
+from price_store import REFRESH_INTERVAL, get_price_store
+from sparkline_images import get_sparkline_image_cache
+from transaction_import import import_transactions
+from ledger import Ledger
+from transactions_db import COLUMN_NAMES, load_positions, migrate_transactions, position_totals
 
 from config import get_db_path
 
@@ -234,26 +245,6 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
-# Rate limiter class for API calls
-class RateLimiter:
-    def __init__(self, max_calls, time_window):
-        self.max_calls = max_calls
-        self.time_window = time_window
-        self.calls = []
-    
-    def can_call(self):
-        now = datetime.now()
-        self.calls = [call_time for call_time in self.calls 
-                     if now - call_time < timedelta(seconds=self.time_window)]
-        
-        if len(self.calls) < self.max_calls:
-            self.calls.append(now)
-            return True
-        return False
-
-# Create rate limiter instance
-price_limiter = RateLimiter(max_calls=50, time_window=60)
-
 # Database functions
 def get_db_path():
     """Get the absolute path for the database file"""
@@ -265,163 +256,82 @@ def get_db_path():
 def init_database():
     """Initialize SQLite database and create table if it doesn't exist"""
     try:
-        db_path = get_db_path()
-        conn = sqlite3.connect(db_path)
-        c = conn.cursor()
-        c.execute('''
-            CREATE TABLE IF NOT EXISTS transactions
-            (id INTEGER PRIMARY KEY AUTOINCREMENT,
-             date TEXT, 
-             asset TEXT,
-             symbol TEXT,
-             quantity REAL,
-             purchase_price REAL,
-             total_cash_invested REAL,
-             current_price REAL,
-             profit_loss REAL)
-        ''')
-        conn.commit()
+        conn = get_connection(get_db_path())
+        with conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS transactions
+                (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                 date TEXT, 
+                 asset TEXT,
+                 symbol TEXT,
+                 quantity REAL,
+                 purchase_price REAL,
+                 total_cash_invested REAL,
+                 current_price REAL,
+                 profit_loss REAL)
+            ''')
+        migrate_transactions(get_db_path())
     except sqlite3.Error as e:
         st.error(f"Database error: {e}")
-    finally:
-        conn.close()
+
+def get_ledger():
+    """Ledger applying changes to the database and st.session_state.transactions together"""
+    return Ledger(st.session_state.transactions, get_db_path())
 
 def save_transaction(transaction_data):
     """Save a new transaction to the database"""
     try:
-        db_path = get_db_path()
-        conn = sqlite3.connect(db_path)
-        c = conn.cursor()
-        c.execute('''
-            INSERT INTO transactions 
-            (date, asset, symbol, quantity, purchase_price, total_cash_invested, current_price, profit_loss)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            transaction_data['Date'],
-            transaction_data['Asset'],
-            transaction_data['Symbol'],
-            transaction_data['Quantity'],
-            transaction_data['Purchase Price'],
-            transaction_data['Total Cash Invested'],
-            transaction_data['Current Price'],
-            transaction_data['Profit/Loss']
-        ))
-        conn.commit()
+        get_ledger().insert(transaction_data)
     except sqlite3.Error as e:
         st.error(f"Error saving transaction: {e}")
-    finally:
-        conn.close()
 
 def load_transactions():
     """Load all transactions from the database"""
     try:
-        db_path = get_db_path()
-        conn = sqlite3.connect(db_path)
-        df = pd.read_sql_query("SELECT * FROM transactions", conn)
-        conn.close()
-        
-        if not df.empty:
-            df = df.rename(columns={
-                'profit_loss': 'Profit/Loss',
-                'date': 'Date',
-                'asset': 'Asset',
-                'symbol': 'Symbol',
-                'quantity': 'Quantity',
-                'purchase_price': 'Purchase Price',
-                'total_cash_invested': 'Total Cash Invested',
-                'current_price': 'Current Price'
-            })
-        return df
+        conn = get_connection(get_db_path())
+        df = pd.read_sql_query("SELECT * FROM transactions ORDER BY id", conn)
+        # Renamed even when empty, the ledger appends rows by display name
+        return df.rename(columns=COLUMN_NAMES)
     except sqlite3.Error as e:
         st.error(f"Error loading transactions: {e}")
-        return pd.DataFrame(
-            columns=['id', 'Date', 'Asset', 'Symbol', 'Quantity', 'Purchase Price', 
-                    'Total Cash Invested', 'Current Price', 'Profit/Loss']
-        )
+        return pd.DataFrame(columns=list(COLUMN_NAMES.values()))
 
 def delete_transaction(transaction_id):
     """Delete a specific transaction from the database"""
     try:
-        db_path = get_db_path()
-        conn = sqlite3.connect(db_path)
-        c = conn.cursor()
-        c.execute("DELETE FROM transactions WHERE id = ?", (transaction_id,))
-        conn.commit()
+        get_ledger().delete(transaction_id)
+        # Coins no longer in the ledger stop being refreshed
+        update_current_prices(missing_only=True)
         return True
     except sqlite3.Error as e:
         st.error(f"Error deleting transaction: {e}")
         return False
-    finally:
-        conn.close()
 
 def clear_transactions():
     """Clear all transactions from the database"""
     try:
-        db_path = get_db_path()
-        conn = sqlite3.connect(db_path)
-        c = conn.cursor()
-        c.execute("DELETE FROM transactions")
-        conn.commit()
+        get_ledger().clear()
+        update_current_prices(missing_only=True)
     except sqlite3.Error as e:
         st.error(f"Error clearing transactions: {e}")
-    finally:
-        conn.close()
 
 
-# First, add these new database functions after the existing database functions:
-# Update the update_transaction function to handle the date:
 def update_transaction(transaction_id, updated_data):
     """Update an existing transaction in the database"""
     try:
-        db_path = get_db_path()
-        conn = sqlite3.connect(db_path)
-        c = conn.cursor()
-        
-        # Create a mapping for column names
-        column_mapping = {
-            'Date': 'date',
-            'Quantity': 'quantity',
-            'Purchase Price': 'purchase_price',
-            'Total Cash Invested': 'total_cash_invested',
-            'Current Price': 'current_price',
-            'Profit/Loss': 'profit_loss'
-        }
-        
-        # Prepare the update query and parameters
-        update_fields = []
-        params = []
-        for key, value in updated_data.items():
-            if key in column_mapping:
-                update_fields.append(f"{column_mapping[key]} = ?")
-                params.append(value)
-        
-        params.append(transaction_id)  # Add transaction_id for WHERE clause
-        
-        update_query = f"""
-            UPDATE transactions 
-            SET {', '.join(update_fields)}
-            WHERE id = ?
-        """
-        
-        c.execute(update_query, params)
-        conn.commit()
+        get_ledger().update(transaction_id, updated_data)
         return True
     except sqlite3.Error as e:
         st.error(f"Error updating transaction: {e}")
         return False
-    finally:
-        conn.close()
 
 
 
 def get_transaction(transaction_id):
     """Retrieve a specific transaction from the database"""
     try:
-        db_path = get_db_path()
-        conn = sqlite3.connect(db_path)
-        c = conn.cursor()
-        c.execute("SELECT * FROM transactions WHERE id = ?", (transaction_id,))
-        result = c.fetchone()
+        conn = get_connection(get_db_path())
+        result = conn.execute("SELECT * FROM transactions WHERE id = ?", (transaction_id,)).fetchone()
         if result:
             # Convert to dictionary
             columns = ['id', 'Date', 'Asset', 'Symbol', 'Quantity', 
@@ -431,21 +341,19 @@ def get_transaction(transaction_id):
     except sqlite3.Error as e:
         st.error(f"Error retrieving transaction: {e}")
         return None
-    finally:
-        conn.close()
 
 
-def calculate_profit_withdrawal_options(transactions_df, coin_selected):
+def calculate_profit_withdrawal_options(coin_selected):
     """Calculate withdrawal options based on profit"""
-    # Get all transactions for selected coin
-    coin_transactions = transactions_df[transactions_df['Asset'] == coin_selected].copy()
-    if coin_transactions.empty:
+    # Totals of the selected coin, read from the position index
+    position = position_totals(get_db_path(), asset=coin_selected)
+    if position.empty:
         return None
     
     # Calculate current total profit/loss
-    total_quantity = coin_transactions['Quantity'].sum()
-    total_invested = coin_transactions['Total Cash Invested'].sum()
-    current_price = st.session_state.current_prices.get(coin_transactions.iloc[0]['Symbol'])
+    total_quantity = position['Quantity'].sum()
+    total_invested = position['Total Cash Invested'].sum()
+    current_price = st.session_state.current_prices.get(position.iloc[0]['Symbol'])
     
     if not current_price:
         return None
@@ -473,6 +381,14 @@ def calculate_profit_withdrawal_options(transactions_df, coin_selected):
     }
 
 
+# Seconds between two timed refreshes of the transaction table. The price
+# store refreshes every REFRESH_INTERVAL, a shorter tick would redraw the same prices.
+REFRESH_OPTIONS = [interval for interval in (15, 30, 60, 120, 300) if interval >= REFRESH_INTERVAL]
+DEFAULT_REFRESH_INTERVAL = REFRESH_INTERVAL
+
+# Seconds a render waits for the shared store to fetch missing or expired prices
+PRICE_WAIT_TIMEOUT = 5
+
 # Session state management
 def init_session_state():
     """Initialize all required session state variables"""
@@ -488,6 +404,12 @@ def init_session_state():
     
     if 'current_prices' not in st.session_state:
         st.session_state.current_prices = {}
+
+    if 'price_fetched_at' not in st.session_state:
+        st.session_state.price_fetched_at = {}
+
+    if 'session_id' not in st.session_state:
+        st.session_state.session_id = str(uuid.uuid4())
     
     if 'last_refresh' not in st.session_state:
         st.session_state.last_refresh = time.time()
@@ -498,16 +420,26 @@ def init_session_state():
         st.session_state.edit_mode = False
 
 # Price update function
-def update_current_prices():
-    """Update current prices for all cryptocurrencies in transactions"""
+def update_current_prices(missing_only=False):
+    """Register displayed coins with the shared price store and read their prices"""
+    coin_ids = set()
     if 'transactions' in st.session_state and not st.session_state.transactions.empty:
-        for _, row in st.session_state.transactions.iterrows():
-            try:
-                current_price = get_current_price(row['Symbol'])
-                if current_price:
-                    st.session_state.current_prices[row['Symbol']] = current_price
-            except Exception as e:
-                st.error(f"Error updating price for {row['Symbol']}: {e}")
+        coin_ids.update(st.session_state.transactions['Symbol'].dropna().unique())
+    if st.session_state.get('sidebar_coin_id'):
+        coin_ids.add(st.session_state.sidebar_coin_id)
+    price_store = get_price_store()
+    if not coin_ids:
+        # Nothing left to price, stop the store refreshing this session's old coins
+        price_store.unwatch(st.session_state.session_id)
+        return
+
+    price_store.watch(st.session_state.session_id, coin_ids)
+    if missing_only:
+        coin_ids = [coin_id for coin_id in coin_ids if coin_id not in st.session_state.current_prices]
+    entries = price_store.get_entries(coin_ids, timeout=PRICE_WAIT_TIMEOUT)
+    for coin_id, entry in entries.items():
+        st.session_state.current_prices[coin_id] = entry.price
+        st.session_state.price_fetched_at[coin_id] = entry.fetched_at
 
 
 # API Functions
@@ -515,7 +447,7 @@ def update_current_prices():
 def fetch_available_coins():
     """Fetch list of available cryptocurrencies from CoinGecko"""
     try:
-        response = requests.get('https://api.coingecko.com/api/v3/coins/list')
+        response = http_get(api_url('/coins/list'), cache=True)
         if response.status_code == 200:
             coins = response.json()
             return {f"{coin['name']} ({coin['symbol'].upper()})": coin['id'] for coin in coins}
@@ -525,25 +457,10 @@ def fetch_available_coins():
         return {}
 
 def get_current_price(coin_id):
-    """Get current price with rate limiting and caching"""
-    # Use cached price if rate limit is reached
-    if not price_limiter.can_call():
-        return st.session_state.current_prices.get(coin_id)
-    
-    try:
-        response = requests.get(
-            f'https://api.coingecko.com/api/v3/simple/price',
-            params={'ids': coin_id, 'vs_currencies': 'usd'},
-            timeout=5  # Add timeout to prevent hanging
-        )
-        if response.status_code == 200:
-            price = response.json()[coin_id]['usd']
-            st.session_state.current_prices[coin_id] = price
-            return price
-        return st.session_state.current_prices.get(coin_id)
-    except Exception as e:
-        st.error(f"Error fetching price: {e}")
-        return st.session_state.current_prices.get(coin_id)
+    """Get current price for a single coin from the shared price store"""
+    st.session_state.sidebar_coin_id = coin_id
+    update_current_prices(missing_only=True)
+    return st.session_state.current_prices.get(coin_id)
 
 # Calculation Functions
 def calculate_profit_loss(quantity, purchase_price, current_price):
@@ -591,6 +508,19 @@ def format_percentage(value):
     return "%".format(value)
 
 
+def format_price_age(coin_id):
+    """Format how long ago the current price of a coin was fetched"""
+    fetched_at = st.session_state.price_fetched_at.get(coin_id)
+    if not fetched_at:
+        return ""
+    age = max(0, time.time() - fetched_at)
+    if age < 60:
+        return f"{age:.0f}s ago"
+    if age < 3600:
+        return f"{age / 60:.0f}m ago"
+    return f"{age / 3600:.0f}h ago"
+
+
 def format_round_currency(value):
     """Format currency values with commas and 2 decimal places"""
     return "${:,.0f}".format(value)
@@ -633,9 +563,28 @@ def process_transaction(selected_coin, quantity, total_investment, purchase_pric
     }
     
     save_transaction(transaction_data)
-    st.session_state.transactions = load_transactions()
     return True
 
+def import_ledger(ledger_file):
+    """Bulk import an uploaded ledger file and reload the transactions"""
+    # Symbols are checked against the coin list, prices are looked up by CoinGecko id
+    coins = fetch_available_coins()
+    if not coins:
+        st.error("Coin list unavailable, the ledger's coins cannot be checked")
+        return
+    try:
+        result = import_transactions(ledger_file, ledger_file.name, get_db_path(), coins)
+    except (ValueError, sqlite3.Error) as e:
+        st.error(f"Error importing transactions: {e}")
+        return
+    st.session_state.transactions = load_transactions()
+    st.success(
+        f"Imported {result.imported:,} transactions in {result.seconds:.2f}s "
+        f"({result.rows_per_second:,.0f} rows/s)"
+    )
+    if result.rejected:
+        st.warning(f"Skipped {result.rejected:,} rows with invalid values or unknown coins")
+
 def create_percentage_bar(value):
     """
     Create a simple percentage bar
@@ -671,22 +620,23 @@ def create_percentage_bar(value):
     """
 
 
-# Add days selection in the sidebar
+# Price history ranges offered in the sidebar
+CHART_DAYS_OPTIONS = {
+    '7': '7 Days',
+    '30': '30 Days',
+    '90': '90 Days',
+    '180': '180 Days',
+    '360': '360 Days'
+}
+
 def add_chart_settings_to_sidebar():
     st.sidebar.markdown("### Chart Settings")
     
     # Days selection
-    days_options = {
-        '7': '7 Days',
-        '30': '30 Days',
-        '90': '90 Days',
-        '180': '180 Days',
-        '360': '360 Days'
-    }
     selected_days = st.sidebar.selectbox(
         "Price History Range",
-        options=list(days_options.keys()),
-        format_func=lambda x: days_options[x],
+        options=list(CHART_DAYS_OPTIONS.keys()),
+        format_func=lambda x: CHART_DAYS_OPTIONS[x],
         key="chart_days"
     )
     
@@ -697,132 +647,192 @@ def add_chart_settings_to_sidebar():
         options=chart_types,
         key="chart_type"
     )
+
+    # Static images load much faster than interactive charts on long ledgers
+    st.sidebar.selectbox(
+        "Sparkline Style",
+        options=['Interactive', 'Image'],
+        key="sparkline_mode"
+    )
+
+    # Live price refresh interval
+    st.sidebar.selectbox(
+        "Price Refresh Interval",
+        options=REFRESH_OPTIONS,
+        index=REFRESH_OPTIONS.index(DEFAULT_REFRESH_INTERVAL),
+        format_func=lambda x: f"{x} Seconds",
+        key="refresh_interval"
+    )
     
     return selected_days, selected_type
 
-# Update price history function to include OHLC data for candlesticks
-def get_coin_price_history(coin_id, days='30'):
-    """Fetch price history with OHLC data"""
-    try:
-        # For candlestick data
-        ohlc_url = f"https://api.coingecko.com/api/v3/coins/{coin_id}/ohlc"
-        # For line chart data
-        line_url = f"https://api.coingecko.com/api/v3/coins/{coin_id}/market_chart"
-        
-        headers = {
-            'accept': 'application/json',
-            'User-Agent': 'Mozilla/5.0'
-        }
-        
-        if st.session_state.chart_type == 'Candlestick':
-            response = requests.get(
-                ohlc_url,
-                params={'vs_currency': 'usd', 'days': days},
-                headers=headers
-            )
+# Both chart types are drawn from the OHLC candles, the Line view uses the close
+HISTORY_KIND = 'ohlc'
+
+def price_view(history, chart_type):
+    """Dates and prices of a canonical OHLC history as shown by a chart type"""
+    if chart_type == 'Candlestick':
+        return history.dates, history.ohlc
+    # Line chart format
+    return history.dates, history.close
+
+def fetch_table_data(transactions, days='30'):
+    """Fetch OHLC histories and logos for every coin in the table concurrently"""
+    assets = list(transactions['Asset'].dropna().unique())
+    
+    # Only coins without a cached history go to the candle store
+    history_cache = get_history_cache()
+    histories = {}
+    coin_ids = []
+    for coin_id in transactions['Symbol'].dropna().str.lower().unique():
+        history = history_cache.get(coin_id, days, HISTORY_KIND)
+        if history is not None:
+            histories[coin_id] = history
+        else:
+            coin_ids.append(coin_id)
+    
+    candle_store = get_candle_store()
+    logo_manager = get_logo_manager()
+    results = gather(
+        *(candle_store.get_series_async(coin_id, HISTORY_KIND, days) for coin_id in coin_ids),
+        *(get_crypto_logo_async(asset, logo_manager) for asset in assets)
+    )
+    
+    for coin_id, rows in zip(coin_ids, results[:len(coin_ids)]):
+        if isinstance(rows, Exception):
+            print(f"Error fetching price history for {coin_id}: {rows}")
+        elif rows:
+            histories[coin_id] = PriceHistory.from_rows(rows)
+            history_cache.put(coin_id, days, HISTORY_KIND, histories[coin_id])
+    
+    logos = {}
+    for asset, logo_path in zip(assets, results[len(coin_ids):]):
+        if isinstance(logo_path, Exception):
+            print(f"Error fetching logo for {asset}: {logo_path}")
         else:
-            response = requests.get(
-                line_url,
-                params={'vs_currency': 'usd', 'days': days, 'interval': 'daily'},
-                headers=headers
+            logos[asset] = logo_path
+    
+    return histories, logos
+
+# Most candles and line points drawn in a sparkline cell
+SPARKLINE_CANDLES = 60
+SPARKLINE_POINTS = 120
+
+def colored_line_traces(dates, prices, up_color='#00ff00', down_color='#ff0000'):
+    """Line traces coloured by the direction of each segment, at most one per colour.
+
+    Every segment becomes an (x0, x1, x1) / (y0, y1, NaN) triple so the NaN
+    breaks the line between segments, and the rising and falling segments
+    are each drawn as a single trace.
+    """
+    x = np.asarray(dates, dtype='datetime64[ms]')
+    y = np.asarray(prices, dtype=float)
+    if y.ndim == 2:
+        # OHLC rows, use the close
+        y = y[:, 3]
+    if len(y) < 2:
+        return []
+    
+    rising = y[1:] >= y[:-1]
+    segment_x = np.column_stack([x[:-1], x[1:], x[1:]])
+    segment_y = np.column_stack([y[:-1], y[1:], np.full(len(y) - 1, np.nan)])
+    
+    traces = []
+    for mask, color in ((rising, up_color), (~rising, down_color)):
+        if mask.any():
+            traces.append(
+                go.Scatter(
+                    x=segment_x[mask].ravel(),
+                    y=segment_y[mask].ravel(),
+                    mode='lines',
+                    line=dict(color=color, width=1.5),
+                    hoverinfo='y',
+                    showlegend=False
+                )
             )
-        
-        if response.status_code == 200:
-            data = response.json()
-            
-            if st.session_state.chart_type == 'Candlestick':
-                # OHLC data format
-                dates = [datetime.fromtimestamp(candle[0]/1000) for candle in data]
-                ohlc = [[candle[1], candle[2], candle[3], candle[4]] for candle in data]
-                return dates, ohlc
-            else:
-                # Line chart format
-                prices = data['prices']
-                dates = [datetime.fromtimestamp(price[0]/1000) for price in prices]
-                values = [price[1] for price in prices]
-                return dates, values
-            
-        print(f"Failed to fetch price history: Status {response.status_code}")
-        return None, None
-    except Exception as e:
-        print(f"Error fetching price history: {e}")
-        return None, None
+    return traces
+
+def weekly_markers(dates, prices):
+    """Dotted lines and price labels for every Monday in a sorted series.
 
-def create_sparkline(dates, prices, current_price, purchase_price):
+    The Mondays are generated as an arange of days and each is labelled with
+    the last point at or before its line, found with searchsorted, so the
+    cost is linear in the series and coarse candles still label every week.
+    """
+    x = np.asarray(dates, dtype='datetime64[ms]')
+    y = np.asarray(prices, dtype=float)
+    if y.ndim == 2:
+        # OHLC rows, label with the close
+        y = y[:, 3]
+    
+    days = x.astype('datetime64[D]')
+    start_day, end_day = days[0], days[-1]
+    # 1970-01-01 was a Thursday, so Monday is 0 here as in datetime.weekday()
+    start_weekday = (start_day.astype(np.int64) + 3) % 7
+    mondays = np.arange(start_day + (-start_weekday) % 7, end_day + 1, 7)
+    # Markers keep the time of day of the first point, and none go past the last
+    marker_x = mondays + (x[0] - start_day)
+    marker_x = marker_x[marker_x <= x[-1]]
+    
+    idx = np.searchsorted(x, marker_x, side='right') - 1
+    found = idx >= 0
+    
+    shapes = [
+        dict(type='line', xref='x', yref='y domain', x0=marker, x1=marker, y0=0, y1=1,
+             line=dict(width=1, dash='dot', color="rgba(255, 255, 255, 0.1)"))
+        for marker in marker_x.tolist()
+    ]
+    annotations = [
+        dict(
+            x=marker,
+            y=price,
+            text=f"${price:,.2f}",
+            showarrow=False,
+            font=dict(
+                size=8,
+                color="rgba(255, 255, 255, 0.5)"
+            ),
+            yshift=10  # Slight shift above the line
+        )
+        for marker, price in zip(marker_x[found].tolist(), y[idx[found]].tolist())
+    ]
+    return shapes, annotations
+
+def create_sparkline(dates, prices):
     """Create a sparkline chart with weekly interval lines and price annotations"""
-    if not dates or not prices:
+    if len(dates) == 0 or len(prices) == 0:
         return None
     
     fig = go.Figure()
     
-    # Helper function to find price at specific date
-    def get_price_at_date(target_date):
-        for i, date in enumerate(dates):
-            if date.date() == target_date.date():
-                return prices[i] if isinstance(prices[0], (int, float)) else prices[i][3]
-        return None
+    # Only draw as many points as the cell can show, markers still use the full series
+    if st.session_state.chart_type == 'Candlestick':
+        trace_dates, trace_prices = downsample(dates, prices, SPARKLINE_CANDLES)
+    else:
+        trace_dates, trace_prices = downsample(dates, prices, SPARKLINE_POINTS)
     
     # Add the price data based on chart type
     if st.session_state.chart_type == 'Candlestick':
         fig.add_trace(
             go.Candlestick(
-                x=dates,
-                open=[p[0] for p in prices],
-                high=[p[1] for p in prices],
-                low=[p[2] for p in prices],
-                close=[p[3] for p in prices],
+                x=trace_dates,
+                open=trace_prices[:, 0],
+                high=trace_prices[:, 1],
+                low=trace_prices[:, 2],
+                close=trace_prices[:, 3],
                 increasing=dict(line=dict(color='#00ff00')),
                 decreasing=dict(line=dict(color='#ff0000')),
                 showlegend=False
             )
         )
     else:
-        # Line chart with daily color changes
-        for i in range(1, len(dates)):
-            color = '#00ff00' if prices[i] >= prices[i-1] else '#ff0000'
-            fig.add_trace(
-                go.Scatter(
-                    x=dates[i-1:i+1],
-                    y=prices[i-1:i+1] if isinstance(prices[0], (int, float)) else [p[3] for p in prices[i-1:i+1]],
-                    mode='lines',
-                    line=dict(color=color, width=1.5),
-                    hoverinfo='y',
-                    showlegend=False
-                )
-            )
+        # Line chart with daily color changes, one trace per direction
+        for trace in colored_line_traces(trace_dates, trace_prices):
+            fig.add_trace(trace)
     
     # Add weekly interval lines and annotations
-    start_date = min(dates)
-    end_date = max(dates)
-    current_date = start_date
-    while current_date <= end_date:
-        # Only add line and annotation if it's the start of a week (Monday)
-        if current_date.weekday() == 0:
-            # Add vertical line
-            fig.add_vline(
-                x=current_date,
-                line_width=1,
-                line_dash="dot",
-                line_color="rgba(255, 255, 255, 0.1)"
-            )
-            
-            # Get price at this date
-            price = get_price_at_date(current_date)
-            if price is not None:
-                # Add price annotation
-                fig.add_annotation(
-                    x=current_date,
-                    y=price,
-                    text=f"${price:,.2f}",
-                    showarrow=False,
-                    font=dict(
-                        size=8,
-                        color="rgba(255, 255, 255, 0.5)"
-                    ),
-                    yshift=10  # Slight shift above the line
-                )
-        
-        current_date += timedelta(days=1)
+    start_date, end_date = np.asarray(dates, dtype='datetime64[ms]')[[0, -1]].tolist()
+    shapes, annotations = weekly_markers(dates, prices)
     
     # Update layout for minimal appearance
     fig.update_layout(
@@ -842,14 +852,495 @@ def create_sparkline(dates, prices, current_price, purchase_price):
             zeroline=False,
             visible=False
         ),
-        hovermode='x unified'
+        hovermode='x unified',
+        shapes=shapes,
+        annotations=annotations
     )
     
     return fig
 
+def build_sparklines(histories):
+    """Build one sparkline per coin from its OHLC history, shared by every row holding that coin.
+
+    In image mode each sparkline is the path of a pre-rendered image rather
+    than a figure.
+    """
+    as_images = st.session_state.get('sparkline_mode') == 'Image'
+    image_cache = get_sparkline_image_cache()
+    sparklines = {}
+    for coin_id, history in histories.items():
+        dates, prices = price_view(history, st.session_state.chart_type)
+        try:
+            if as_images:
+                sparklines[coin_id] = image_cache.get(
+                    coin_id,
+                    st.session_state.chart_days,
+                    st.session_state.chart_type,
+                    dates,
+                    prices,
+                    lambda: create_sparkline(dates, prices)
+                )
+            else:
+                sparklines[coin_id] = create_sparkline(dates, prices)
+        except Exception as e:
+            print(f"Error building sparkline for {coin_id}: {e}")
+    return sparklines
 
 
 
+def render_transaction_table(auto_refresh):
+    """Render the price-dependent part of the page: transaction rows, totals and asset summary.
+
+    Runs as a fragment, so a timed refresh reruns only this region and the
+    script thread is released between ticks.
+    """
+    if st.session_state.transactions.empty:
+        return
+
+    try:
+        # Update current prices if auto-refresh is enabled
+        if auto_refresh and should_update_prices():
+            update_current_prices()
+        else:
+            update_current_prices(missing_only=True)
+        
+        left_header_space, right_header_space, right_space = st.columns([0.1,3,6.9])
+        with left_header_space:
+            st.markdown("<div style='margin-left: -1.25rem;'>✨</div>", unsafe_allow_html=True)
+        with right_header_space:
+            st.header('Transaction Records')
+        
+        
+        # Create headers
+        col_headers = st.columns([2, 1, 2, 2, 2, 2, 2, 2, 2, 2, 2, 1, 1])
+        headers = ['Purchase Date', 'Logo', 'Asset', 'Quantity', 'Invested Cash', 
+                 'Purchase Price', 'Current Price', 'Chart', 'Profit/Loss', "% Yield", "Performance"]
+        
+        for col, header in zip(col_headers[:-1], headers):
+            with col:
+                # if header == '':
+                #     st.markdown(f"""
+                #     <div style='background-color:transparent;color:yellow;
+                #     font-weight:bold;font-family:Tahoma;padding-top:0.25rem;padding-bottom:0.5rem;padding-left:0.1rem;
+                #     padding-right:0.1rem;height: 4rem;box-shadow: rgba(50, 50, 93, 0.25) 0px 30px 60px -12px inset, rgba(0, 0, 0, 0.3) 0px 18px 36px -18px inset;
+                #     border: 0rem solid #0085ca; border-radius: 0.25rem;letter-spacing:0.1rem;
+                #     text-align:center;font-size:1rem;margin-right: 0rem;opacity: 0.8;'>
+                #     {header}
+                #     </div>
+                # """, unsafe_allow_html=True)
+                # else:
+                st.markdown(f"""
+                    <div style='background-color:#1965e1;color:yellow;
+                    font-weight:bold;font-family:Tahoma;padding-top:0.25rem;padding-bottom:0.5rem;padding-left:0.1rem;
+                    padding-right:0.1rem;height: 4rem;box-shadow: rgba(50, 50, 93, 0.25) 0px 30px 60px -12px inset, rgba(0, 0, 0, 0.3) 0px 18px 36px -18px inset;
+                    border: 0.1rem solid #0085ca; border-radius: 0.25rem;letter-spacing:0.1rem;
+                    text-align:center;font-size:1rem;margin-right: 0rem;opacity: 0.8;'>
+                    {header}
+                    </div>
+                """, unsafe_allow_html=True)
+
+        # Fetch chart data and logos for all rows in one concurrent round
+        histories, logos = fetch_table_data(
+            st.session_state.transactions,
+            days=st.session_state.chart_days
+        )
+        sparklines = build_sparklines(histories)
+
+        # Load the other ranges in the background so switching range is served from cache
+        get_history_prefetcher().prefetch(
+            list(histories),
+            [days for days in CHART_DAYS_OPTIONS if days != st.session_state.chart_days],
+            HISTORY_KIND
+        )
+
+        # Display transactions
+        for index, row in st.session_state.transactions.iterrows():
+            cols = st.columns([2, 1, 2, 2, 2, 2, 2, 2, 2, 2, 2, 1, 1])
+            if index == 0:
+                margin_value = 1
+            elif index == len(st.session_state.transactions) - 1:
+                margin_value = 0
+            else:
+                margin_value = 0
+
+            # positive_impact = st.empty()
+            current_price = st.session_state.current_prices.get(row['Symbol'])
+            if current_price:
+                profit_loss = calculate_profit_loss(row['Quantity'],
+                                                          row['Purchase Price'],
+                                                          current_price)
+                performance_rate = profit_loss * 100 / row['Total Cash Invested']
+            # Continue with the display of transaction details...
+            # Display transaction details
+            with cols[0]:  # Date
+                st.markdown(f"""
+                    <p style='margin-top:{margin_value}rem;margin-left:-0.5rem;padding-left: 2rem;font-size:15px;text-align:left;
+                    border-left:0.5rem solid #0085ca;padding-top:8px;letter-spacing:1px;opacity: 0.8;'>
+                    {row['Date']}</p>
+                """, unsafe_allow_html=True)
+            
+            # with cols[1]:  # Asset
+            #     st.markdown(f"""
+            #         <p style='margin-top:{margin_value}rem;font-size:15px;text-align:center;opacity: 1;
+            #         padding-top:.75rem;letter-spacing:0.5px;'>{row['Asset']}</p>
+            #     """, unsafe_allow_html=True)
+
+            with cols[1]:
+                logo_path = logos.get(row['Asset'])
+                if logo_path and os.path.exists(logo_path):
+                    if index == 0:
+                        st.write('')
+                        # st.write('')
+                    st.image(logo_path, width=40)
+                else:
+                    st.write("")  # Empty space for alignment
+            with cols[2]:
+                # row['Asset'] = re.sub("\s\(.*\)", "", row['Asset'])
+                if index == 0:
+                    st.markdown(f"""
+                    <div style='padding-top: 0rem; margin-top: 1.75rem;text-align: left;margin-left: 0.5rem;'>
+                        <span style='font-size:16px;opacity:0.8;
+                        letter-spacing:0.5px;'>{row['Asset']}</span>
+                    </div>
+                """, unsafe_allow_html=True)
+                else:                          
+                    # margin_top_value = '2rem' if len(row['Asset']) >= 15 else '2rem'
+                    st.markdown(f"""
+                        <div style='padding-top: 0rem; margin-top: 0.65rem; margin-bottom: 0.5rem;text-align: left;margin-left: 0.5rem;'>
+                            <span style='font-size:15px;opacity:0.8; white-space: nowrap;
+                            letter-spacing:0.5px;'>{row['Asset']}</span>
+                        </div>
+                    """, unsafe_allow_html=True)
+
+                
+            
+            with cols[3]:  # Quantity
+                st.markdown(f"""
+                    <p style='margin-top:{margin_value}rem;font-size:16px;text-align:center;opacity: 0.8;
+                    padding-top:0.8rem;letter-spacing:1px;'>{row['Quantity']:.3f}</p>
+                """, unsafe_allow_html=True)
+            
+            with cols[4]:  # Total Cash Invested
+                st.markdown(f"""
+                    <p style='margin-top:{margin_value}rem;text-align:right;font-size:20px;padding-right: 1rem;opacity: 0.8;\
+                    box-shadow: white 0px 10px 10px -25px inset, white 0px 18px 36px -29px inset;border: 0.5px solid white;border-radius: 5px;
+                    padding-top:0.5rem;padding-bottom:0.5rem;letter-spacing:1px;'>{format_round_currency(row['Total Cash Invested'])}</p>
+                """, unsafe_allow_html=True)
+            
+            with cols[5]:  # Purchase Price
+                purchase_price = row['Purchase Price']
+                st.markdown(f"""
+                    <p style='margin-top:{margin_value}rem;text-align:right;font-size:20px;padding-right: 1rem;opacity: 0.7;
+                    padding-top:0.5rem;letter-spacing:1px;'>{format_currency(row['Purchase Price'])}</p>
+                """, unsafe_allow_html=True)
+            
+            with cols[6]:  # Current Price
+                current_price = st.session_state.current_prices.get(row['Symbol'])
+                if current_price:
+                    color = '#0fe6d2' if current_price >= row['Purchase Price'] else '#dd3342'
+                    st.markdown(f"""
+                        <p style='margin-top:{margin_value}rem;text-align:right;font-size:20px;padding-top:0.6rem;padding-right: 1rem;
+                        color:{color};letter-spacing:1.5px;' title='Updated {format_price_age(row['Symbol'])}'>
+                        {format_currency(current_price)}</p>
+                        <p style='margin-top:-1.25rem;text-align:right;font-size:11px;padding-right: 1rem;opacity: 0.5;'>
+                        {format_price_age(row['Symbol'])}</p>
+                    """, unsafe_allow_html=True)
+                else:
+                    st.markdown(f"<p style='margin-top:{margin_value}rem;'>Price unavailable</p>", 
+                              unsafe_allow_html=True)
+            
+            with cols[7]:
+                try:
+                    if index == 0:
+                        st.write('')
+                    if 'Symbol' in row:
+                        fig = sparklines.get(row['Symbol'].lower())
+                        if isinstance(fig, str):
+                            st.image(fig, use_container_width=True)
+                        elif fig:
+                            st.plotly_chart(fig, use_container_width=True, key=f"chart_{index}")
+                        else:
+                            st.write("No data")
+                except Exception as e:
+                    st.write(f"Chart error: {e}")
+
+
+            with cols[8]:  # Profit/Loss
+                if current_price:
+                    profit_loss = calculate_profit_loss(row['Quantity'], 
+                                                      row['Purchase Price'], 
+                                                      current_price)
+                    color = '#00ff00' if profit_loss > 0 else '#c80c20'
+                    background_color = "#075f00" if profit_loss > 0 else '#ec124e'
+                    st.markdown(f"""
+                        <p style='margin-top:{margin_value}rem;margin-left:0.15rem;text-align:right;font-size:20px;font-weight:400;padding-right: 0.5rem;padding-top:0.5rem;padding-bottom:0.5rem;\
+                                border-radius: 5px; border: 0.5px solid {background_color}; width: 100%; font-weight: 500;box-shadow: {background_color} 0px 10px 10px -29px inset, {background_color} 0px 18px 36px -28px inset;
+                        color:{color};letter-spacing:2px;background-color:transparent;'>
+                        {format_currency(profit_loss)}</p>
+                    """, unsafe_allow_html=True)
+                else:
+                    st.markdown(f"<p style='margin-top:{margin_value}rem;'>-</p>", 
+                              unsafe_allow_html=True)
+            with cols[9]: # % Yield
+                if current_price:
+                    # import numpy as np
+                    profit_loss = calculate_profit_loss(row['Quantity'], 
+                                                      row['Purchase Price'], 
+                                                      current_price)
+                    performance_rate = profit_loss * 100 / row['Total Cash Invested']
+                    positive_impact = performance_rate
+                    color = '#00ff00' if profit_loss > 0 else '#c80c20'
+                    background_color = "#075f00" if profit_loss > 0 else '#ec124e'
+                    # icon = '📈' if profit_loss > 0 else '📉'
+
+                    st.markdown(f"""
+                        <p style='margin-top:{margin_value}rem;text-align:right;font-size:20px;font-weight:500;padding-right: 0.5rem;padding-top:0.5rem;padding-bottom:0.5rem;\
+                                border-radius: 5px; border: 0.5px solid {background_color}; box-shadow: {background_color} 0px 10px 10px -29px inset, {background_color} 0px 18px 36px -29px inset;
+                        color:{color};letter-spacing:2px;background-color: transparent;'>
+                        {np.round(performance_rate,2)}%</p>
+                    """, unsafe_allow_html=True)
+                else:
+                    st.markdown(f"<p style='margin-top:{margin_value}rem;'>-</p>", 
+                              unsafe_allow_html=True)
+            
+            with cols[10]:  # Performance column
+                if current_price:
+                    if index == 0:
+                        st.write("")
+                    profit_loss = calculate_profit_loss(row['Quantity'], 
+                                                    row['Purchase Price'], 
+                                                    current_price)
+                    performance_rate = profit_loss * 100 / row['Total Cash Invested']
+                    st.markdown(create_percentage_bar(performance_rate), unsafe_allow_html=True)
+
+            with cols[11]:  # Edit/Delete Buttons
+                if index == 0:
+                    st.write('')
+                st.markdown(f"""<style>
+                            .stElementContainer.element-container.st-key-edit_{row['id']}
+                                {{
+                                    margin-top: -1.1rem;
+                                    margin-left: -0.5rem;
+                                    padding: .9rem;
+                                    padding-top: 0.4rem;
+                                    padding-bottom: 0.4rem;
+                                    border-radius: 5px;
+                            }}                                  
+                </style>""", unsafe_allow_html=True)
+                # st.write('<div style="margin-top: -2rem;"></div>', unsafe_allow_html=True)
+                if st.button('✏️', key=f"edit_{row['id']}"):
+                    st.session_state.editing_transaction = row['id']
+                    st.session_state.edit_mode = True
+                    st.rerun()
+
+            with cols[12]:
+                if index == 0:
+                    st.write('')
+                st.markdown(f"""<style>
+                            .stElementContainer.element-container.st-key-delete_{row['id']}
+                                {{
+                                    margin-top: -1.1rem;
+                                    margin-left: -1.25rem;
+                                    padding: .9rem;
+                                    padding-top: 0.4rem;
+                                    padding-bottom: 0.4rem;
+                                    border-radius: 5px;
+                            }}                                  
+                </style>""", unsafe_allow_html=True)
+                if st.button('🗑️', key=f"delete_{row['id']}"):
+                    if delete_transaction(row['id']):
+                        st.success("Transaction deleted!")
+                        st.rerun()
+        
+            # Separator lines
+            if index == len(st.session_state.transactions) - 1:
+                st.markdown(f"""
+                    <hr style='margin-top:{margin_value}rem;margin-bottom:0rem;
+                    border:0.1px solid transparent;box-shadow:0px 20px 40px yellow;'>
+                """, unsafe_allow_html=True)
+            else:
+                st.markdown(f"""
+                    <hr style='margin-top:{0}rem;margin-bottom:0rem;border: 0.25px dash white;'>
+                """, unsafe_allow_html=True)
+
+        
+        
+            
+        
+        # Calculate and display summary statistics
+        st.write("")
+        st.write("")
+        left_space, col1, middle_space, col2, col3, col4, right_space = st.columns([1,10,5,10,10,10, 1])
+        
+        # st.markdown('<div style=""></div>', unsafe_allow_html=True)
+        # st.markdown('<div style=""></div>', unsafe_allow_html=True)
+        with col1:
+            total_investment = st.session_state.transactions['Total Cash Invested'].sum()
+            
+            # st.markdown('<div class="total-cash-invested" >', unsafe_allow_html=True)
+            # st.metric(
+            #     label="Total Cash Invested",
+            #     value=format_currency(total_investment),
+            #     delta=total_investment,
+            #     delta_color="off"
+            # )
+
+            # st.markdown('</div>', unsafe_allow_html=True)
+            # Instead of using st.metric, use custom HTML
+            st.markdown(f"""
+                <div style='padding: 0rem; letter-spacing: 2px;margin-top:0.1rem;opacity:0.7;'>
+                    <p style='color: white; font-size: 14px; margin-bottom: 0.5rem; '>Total Cash Invested</p>
+                    <p style='font-size: 2rem; margin-top:-0.5rem;font-size: 36px; font-weight: 700;'>{format_currency(total_investment)}</p>
+                </div>
+            """, unsafe_allow_html=True)
+        
+        with col2:
+            actual_cash_yield = sum(
+                calculate_profit_loss(
+                    row['Quantity'],
+                    row['Purchase Price'],
+                    st.session_state.current_prices.get(row['Symbol']) or row['Current Price']
+                ) + row['Total Cash Invested']
+                for _, row in st.session_state.transactions.iterrows()
+            )
+            
+            actual_profit_loss = actual_cash_yield - total_investment
+            perc_yield = actual_profit_loss / total_investment
+            if perc_yield > 0.3:
+                emoji = "🎉"*4 + "✈️"*4
+            elif perc_yield > 0.2:
+                emoji = "🎉 😍 🚀 ✈️"
+            elif perc_yield > 0.15:
+                emoji = "🎉 😍 🚀"
+            elif perc_yield > 0.1:
+                emoji = "🎉 😍"
+            elif perc_yield > 0.05:
+                emoji = "🎉"
+            else:
+                emoji = "💥"
+            st.metric(
+                label="Actual Cash Yield",
+                value=format_currency(actual_cash_yield),
+                delta=emoji
+            )
+        
+        with col3:
+            total_profit_loss = sum(
+                calculate_profit_loss(
+                    row['Quantity'],
+                    row['Purchase Price'],
+                    st.session_state.current_prices.get(row['Symbol']) or row['Current Price']
+                )
+                for _, row in st.session_state.transactions.iterrows()
+            )
+            
+            formatted_profit_loss = format_currency(abs(total_profit_loss))
+            if total_profit_loss < 0:
+                formatted_profit_loss = f"-{formatted_profit_loss}"
+                color = "inverse"
+            else:
+                color = "normal"
+            
+            st.metric(
+                label="Total Profit/Loss",
+                value=formatted_profit_loss,
+                delta=formatted_profit_loss,
+                delta_color=color
+            )
+
+        with col4:
+            if total_investment and total_profit_loss:
+                actual_percentage_yield = total_profit_loss * 100 / total_investment
+                formatted_perc_yield= np.round(actual_percentage_yield,2)
+                if total_profit_loss < 0:
+                    formatted_perc_yield = f"{formatted_perc_yield} %"
+                    color = "inverse"
+                else:
+                    formatted_perc_yield = f"{formatted_perc_yield} %"
+                    color = "normal"
+                
+                st.metric(
+                    label="Actual % Yield",
+                    value=formatted_perc_yield,
+                    delta=formatted_perc_yield,
+                    delta_color=color
+                )
+            else:
+                st.metric(
+                    label="Actual % Yield",
+                    value=0,
+                    delta='normal'
+                )
+        
+
+        
+
+        st.write("")
+        # Asset summary
+        st.markdown("""
+            <hr style='margin-top:1.5rem;margin-bottom:1.5rem;
+            border:0.5px solid transparent;box-shadow:0px -30px 40px yellow;'>
+        """, unsafe_allow_html=True)
+        
+        st.subheader('Profit/Loss by Asset')
+        asset_summary = pd.DataFrame()
+        if not st.session_state.transactions.empty:
+            # One precomputed row per asset; profit/loss is its value less its cost basis
+            positions = load_positions(get_db_path())
+            live_prices = positions['Symbol'].map(
+                lambda symbol: st.session_state.current_prices.get(symbol) or np.nan
+            ).astype(float)
+            # Assets without a live price are valued at the prices saved with their transactions
+            current_value = (positions['Quantity'] * live_prices).fillna(positions['Stored Value'])
+            profit_loss = current_value - positions['Cost Basis']
+            asset_summary = pd.DataFrame({
+                'Asset': positions['Asset'],
+                'Total Cash Invested': positions['Total Cash Invested'],
+                'Profit/Loss': profit_loss,
+                'Actual Cash Yield': positions['Total Cash Invested'] + profit_loss
+            })
+        
+        if not asset_summary.empty:
+            st.dataframe(
+                asset_summary,
+                column_config={
+                    'Total Cash Invested': st.column_config.NumberColumn(
+                        'Total Cash Invested',
+                        help='Total amount invested',
+                        format="$%.2f",
+                    ),
+                    'Profit/Loss': st.column_config.NumberColumn(
+                        'Profit/Loss',
+                        help='Current profit or loss',
+                        format="$%.2f",
+                    ),
+                    'Actual Cash Yield': st.column_config.NumberColumn(
+                        'Actual Cash Yield',
+                        help='The Actual Return Cash yielded from investment',
+                        format="$%.2f",
+                    ),
+                },
+                hide_index=True,
+                use_container_width=True
+            )
+        
+        # Control buttons
+        # st.markdown("<hr style='margin-top:2rem;margin-bottom:2rem;border:1px solid #2d3436;'>",
+        #           unsafe_allow_html=True)
+        
+        left_button_space, col1, col2, right_button_space = st.columns([4,3,3,4])
+        with col1:
+            if st.button('Refresh Prices', key="reset_button", type="secondary"):
+                st.rerun(scope="fragment")
+        
+        with col2:
+            if st.button('Clear All Transactions', type="secondary", key="clear_transactions"):
+                clear_transactions()
+                st.success('All transactions cleared!')
+                st.rerun()
+    except Exception as e:
+        st.error(f"An error occurred: {str(e)}")
+
 
 def main():
     # In your main app layout, add the days selector to sidebar
@@ -887,777 +1378,327 @@ def main():
 
     
 
-    # Create placeholders for dynamic content
-    main_placeholder = st.empty()
     # Example usage:
     # Basic usage with label
     # st.markdown(
     #     create_advanced_percentage_bar(65, label="Progress"), 
     #     unsafe_allow_html=True
     # )
-    while True:
-        try:
-            with main_placeholder.container():
-                # Add date and time pickers in sidebar
-                transaction_date = st.sidebar.date_input(
-                    "Transaction Date",
-                    value=datetime.now().date(),
-                    key="new_transaction_date"
-                )
-                transaction_time = st.sidebar.time_input(
-                    "Transaction Time",
-                    value=datetime.now().time(),
-                    key="new_transaction_time"
-                )
+    # Add date and time pickers in sidebar
+    transaction_date = st.sidebar.date_input(
+        "Transaction Date",
+        value=datetime.now().date(),
+        key="new_transaction_date"
+    )
+    transaction_time = st.sidebar.time_input(
+        "Transaction Time",
+        value=datetime.now().time(),
+        key="new_transaction_time"
+    )
 
-                # Combine date and time when processing transaction
-                transaction_datetime = datetime.combine(transaction_date, transaction_time)
+    # Combine date and time when processing transaction
+    transaction_datetime = datetime.combine(transaction_date, transaction_time)
 
-                # Input section in sidebar
-                input_method = st.sidebar.selectbox(
-                    "Choose input method:",
-                    ['Enter Quantity', 'Enter Total Investment']
-                )
+    # Input section in sidebar
+    input_method = st.sidebar.selectbox(
+        "Choose input method:",
+        ['Enter Quantity', 'Enter Total Investment']
+    )
+    
+    selected_coin = st.sidebar.selectbox(
+        'Select Cryptocurrency', 
+        options=[""] + list(fetch_available_coins().keys())
+    )
+    
+    current_price = None
+    if selected_coin:
+        coin_id = fetch_available_coins()[selected_coin]
+        current_price = st.session_state.current_prices.get(coin_id) or get_current_price(coin_id)
+    
+    purchase_price = st.sidebar.number_input('Purchase Price ($)', min_value=0.0, step=0.01)
+    
+    quantity = 0.0
+    total_investment = 0.0
+    
+    if input_method == 'Enter Quantity':
+        quantity = st.sidebar.number_input('Quantity', min_value=0.0, step=0.01)
+        if quantity > 0 and purchase_price > 0:
+            total_investment = calculate_total_investment(quantity, purchase_price)
+            st.sidebar.write(f"Total Cash Invested: {format_currency(total_investment)}")
+    else:
+        total_investment = st.sidebar.number_input('Total Cash Invested ($)', min_value=0.0, step=0.01)
+        if total_investment > 0 and purchase_price > 0:
+            quantity = calculate_quantity(total_investment, purchase_price)
+            st.sidebar.write(f"Quantity: {quantity:.8f}")
+    
+    if selected_coin and current_price:
+        st.sidebar.write(f"Current Price: {format_currency(current_price)}")
+        if quantity > 0:
+            current_value = quantity * current_price
+            st.sidebar.write(f"Current Value: {format_currency(current_value)}")
+    
+
+    # Update the Add Transaction button section
+    if st.sidebar.button('Add Transaction', type="primary"):
+        if selected_coin and purchase_price > 0 and current_price:
+            if process_transaction(
+                selected_coin, 
+                quantity, 
+                total_investment, 
+                purchase_price, 
+                coin_id, 
+                current_price, 
+                input_method,
+                transaction_datetime  # Pass the combined datetime
+            ):
+                st.sidebar.success('Transaction added successfully!')
+        else:
+            st.sidebar.error('Please fill in all required fields')
+
+    # Bulk import of a ledger exported from an exchange or another tracker
+    with st.sidebar.expander('Import Transactions'):
+        ledger_file = st.file_uploader(
+            'CSV or JSON ledger',
+            type=['csv', 'json', 'jsonl'],
+            help='Needs Date, Asset, Symbol, Quantity and Purchase Price columns',
+            key='import_file'
+        )
+        if ledger_file is not None and st.button('Import', key='import_transactions'):
+            import_ledger(ledger_file)
+    
+    # Display Transactions
+    left_col, right_col = st.columns([0.01, 9.5])
+    
+    with right_col:
+        # Edit Transaction Form
+        if st.session_state.edit_mode and st.session_state.editing_transaction:
+            transaction = get_transaction(st.session_state.editing_transaction)
+            if transaction:
+                st.markdown("### Edit Transaction")
                 
-                selected_coin = st.sidebar.selectbox(
-                    'Select Cryptocurrency', 
-                    options=[""] + list(fetch_available_coins().keys())
-                )
+                # Use columns for the form
+                edit_cols = st.columns([2, 2, 2, 2, 2, 1.5, 1.5])
                 
-                current_price = None
-                if selected_coin:
-                    coin_id = fetch_available_coins()[selected_coin]
-                    current_price = st.session_state.current_prices.get(coin_id) or get_current_price(coin_id)
+                # Add separate date and time pickers
+                with edit_cols[0]:
+                    # Convert stored date string to datetime object
+                    current_datetime = datetime.strptime(transaction['Date'], '%Y-%m-%d %H:%M')
+                    new_date = st.date_input(
+                        'Transaction Date',
+                        value=current_datetime.date(),
+                        key='edit_date'
+                    )
                 
-                purchase_price = st.sidebar.number_input('Purchase Price ($)', min_value=0.0, step=0.01)
+                with edit_cols[1]:
+                    new_time = st.time_input(
+                        'Transaction Time',
+                        value=current_datetime.time(),
+                        key='edit_time'
+                    )
                 
-                quantity = 0.0
-                total_investment = 0.0
+                with edit_cols[2]:
+                    new_quantity = st.number_input(
+                        'New Quantity',
+                        value=float(transaction['Quantity']),
+                        min_value=0.0,
+                        step=0.01,
+                        key='edit_quantity'
+                    )
                 
-                if input_method == 'Enter Quantity':
-                    quantity = st.sidebar.number_input('Quantity', min_value=0.0, step=0.01)
-                    if quantity > 0 and purchase_price > 0:
-                        total_investment = calculate_total_investment(quantity, purchase_price)
-                        st.sidebar.write(f"Total Cash Invested: {format_currency(total_investment)}")
-                else:
-                    total_investment = st.sidebar.number_input('Total Cash Invested ($)', min_value=0.0, step=0.01)
-                    if total_investment > 0 and purchase_price > 0:
-                        quantity = calculate_quantity(total_investment, purchase_price)
-                        st.sidebar.write(f"Quantity: {quantity:.8f}")
+                with edit_cols[3]:
+                    new_purchase_price = st.number_input(
+                        'New Purchase Price ($)',
+                        value=float(transaction['Purchase Price']),
+                        min_value=0.0,
+                        step=0.01,
+                        key='edit_purchase_price'
+                    )
                 
-                if selected_coin and current_price:
-                    st.sidebar.write(f"Current Price: {format_currency(current_price)}")
-                    if quantity > 0:
-                        current_value = quantity * current_price
-                        st.sidebar.write(f"Current Value: {format_currency(current_value)}")
+                with edit_cols[4]:
+                    new_total_invested = st.number_input(
+                        'New Total Investment ($)',
+                        value=float(transaction['Total Cash Invested']),
+                        min_value=0.0,
+                        step=0.01,
+                        key='edit_total_invested'
+                    )
                 
+                with edit_cols[5]:
+                    if st.button('Save Changes', type='primary', key='save_edit'):
+                        # Combine date and time
+                        new_datetime = datetime.combine(new_date, new_time)
+                        
+                        # Calculate new values
+                        new_profit_loss = calculate_profit_loss(
+                            new_quantity,
+                            new_purchase_price,
+                            transaction['Current Price']
+                        )
+                        
+                        # Update transaction
+                        updated_data = {
+                            'Date': new_datetime.strftime('%Y-%m-%d %H:%M'),
+                            'Quantity': new_quantity,
+                            'Purchase Price': new_purchase_price,
+                            'Total Cash Invested': new_total_invested,
+                            'Profit/Loss': new_profit_loss
+                        }
+                        
+                        if update_transaction(st.session_state.editing_transaction, updated_data):
+                            st.success('Transaction updated successfully!')
+                            st.session_state.edit_mode = False
+                            st.session_state.editing_transaction = None
+                            st.rerun()
+                
+                with edit_cols[6]:
+                    if st.button('Cancel', type='secondary', key='cancel_edit'):
+                        st.session_state.edit_mode = False
+                        st.session_state.editing_transaction = None
+                        st.rerun()
+                
+                st.markdown("<hr>", unsafe_allow_html=True)
+        
+        
+        if not st.session_state.transactions.empty:
+            # Only the table region reruns on each refresh tick
+            refresh_every = st.session_state.refresh_interval if auto_refresh else None
+            st.fragment(render_transaction_table, run_every=refresh_every)(auto_refresh)
+
 
-                # Update the Add Transaction button section
-                if st.sidebar.button('Add Transaction', type="primary"):
-                    if selected_coin and purchase_price > 0 and current_price:
-                        if process_transaction(
-                            selected_coin, 
-                            quantity, 
-                            total_investment, 
-                            purchase_price, 
-                            coin_id, 
-                            current_price, 
-                            input_method,
-                            transaction_datetime  # Pass the combined datetime
-                        ):
-                            st.sidebar.success('Transaction added successfully!')
-                    else:
-                        st.sidebar.error('Please fill in all required fields')
+    # Add this to your main app
+    st.markdown("<hr>", unsafe_allow_html=True)
+    st.header("New Balance if Withdrawal")
+
+    if not st.session_state.transactions.empty:
+        unique_coins = st.session_state.transactions['Asset'].unique()
+        
+        col1, col2 = st.columns([3, 7])
+        
+        with col1:
+            selected_coin = st.selectbox(
+                "Select Coin to Withdraw",
+                options=unique_coins,
+                key="withdrawal_coin"
+            )
+            
+            profit_data = calculate_profit_withdrawal_options(selected_coin)
+            
+            if profit_data and profit_data['total_profit'] > 0:
+                # Show total profit
+                st.metric(
+                    "Total Profit Available",
+                    f"${profit_data['total_profit']:,.2f}",
+                    help="Current profit for selected coin"
+                )
                 
-                # Display Transactions
-                left_col, right_col = st.columns([0.01, 9.5])
+                # Reference targets
+                st.markdown("### Reference Targets")
+                ref_cols = st.columns(5)
+                for i, (label, data) in enumerate(profit_data['reference_targets'].items()):
+                    with ref_cols[i]:
+                        st.markdown(f"""
+                            <div style='text-align: center; border: 1px solid rgba(255,255,255,0.1); 
+                            padding: 5px; border-radius: 5px;'>
+                                <div style='font-size: 0.8em; color: rgba(255,255,255,0.6);'>{label}</div>
+                                <div style='font-size: 0.9em;'>${data['amount']:,.2f}</div>
+                            </div>
+                        """, unsafe_allow_html=True)
                 
-                with right_col:
-                    # Edit Transaction Form
-                    if st.session_state.edit_mode and st.session_state.editing_transaction:
-                        transaction = get_transaction(st.session_state.editing_transaction)
-                        if transaction:
-                            st.markdown("### Edit Transaction")
-                            
-                            # Use columns for the form
-                            edit_cols = st.columns([2, 2, 2, 2, 2, 1.5, 1.5])
-                            
-                            # Add separate date and time pickers
-                            with edit_cols[0]:
-                                # Convert stored date string to datetime object
-                                current_datetime = datetime.strptime(transaction['Date'], '%Y-%m-%d %H:%M')
-                                new_date = st.date_input(
-                                    'Transaction Date',
-                                    value=current_datetime.date(),
-                                    key='edit_date'
-                                )
+                # Custom withdrawal input
+                st.markdown("### Custom Withdrawal")
+                withdrawal_amount = st.number_input(
+                    "Enter withdrawal amount ($)",
+                    min_value=0.0,
+                    max_value=float(profit_data['total_profit']),
+                    value=0.0,
+                    step=100.0,
+                    key="custom_withdrawal"
+                )
+                
+                # Show percentage of profit
+                if withdrawal_amount > 0:
+                    withdrawal_percentage = (withdrawal_amount / profit_data['total_profit']) * 100
+                    withdrawal_coins = withdrawal_amount / profit_data['current_price']
+                    st.markdown(f"""
+                        <div style='margin-top: 10px;'>
+                            <span style='color: rgba(255,255,255,0.6);'>This represents:</span><br/>
+                            • {withdrawal_percentage:.1f}% of your profit<br/>
+                            • {withdrawal_coins:.4f} coins
+                        </div>
+                    """, unsafe_allow_html=True)
+                
+
+                
+                if st.button("Calculate New Balance", type="secondary", key="calculate_new_balance"):
+                    if withdrawal_amount > 0:
+                        with col2:
+                            withdrawal_coins = withdrawal_amount / profit_data['current_price']
+                            st.markdown("### Impact Analysis")
                             
-                            with edit_cols[1]:
-                                new_time = st.time_input(
-                                    'Transaction Time',
-                                    value=current_datetime.time(),
-                                    key='edit_time'
+                            # Holdings
+                            st.markdown("#### Holdings")
+                            cols = st.columns(2)
+                            with cols[0]:
+                                st.metric(
+                                    "Original Quantity",
+                                    f"{profit_data['total_quantity']:.4f}"
                                 )
-                            
-                            with edit_cols[2]:
-                                new_quantity = st.number_input(
-                                    'New Quantity',
-                                    value=float(transaction['Quantity']),
-                                    min_value=0.0,
-                                    step=0.01,
-                                    key='edit_quantity'
+                            with cols[1]:
+                                new_quantity = profit_data['total_quantity'] - withdrawal_coins
+                                st.metric(
+                                    "New Quantity",
+                                    f"{new_quantity:.4f}",
+                                    delta=f"-{withdrawal_coins:.4f}"
                                 )
                             
-                            with edit_cols[3]:
-                                new_purchase_price = st.number_input(
-                                    'New Purchase Price ($)',
-                                    value=float(transaction['Purchase Price']),
-                                    min_value=0.0,
-                                    step=0.01,
-                                    key='edit_purchase_price'
-                                )
+                            # Investment Values
+                            st.markdown("#### Investment")
+                            withdrawal_ratio = withdrawal_coins / profit_data['total_quantity']
+                            new_invested = profit_data['total_invested'] * (1 - withdrawal_ratio)
                             
-                            with edit_cols[4]:
-                                new_total_invested = st.number_input(
-                                    'New Total Investment ($)',
-                                    value=float(transaction['Total Cash Invested']),
-                                    min_value=0.0,
-                                    step=0.01,
-                                    key='edit_total_invested'
+                            cols = st.columns(2)
+                            with cols[0]:
+                                st.metric(
+                                    "Original Investment",
+                                    f"${profit_data['total_invested']:,.2f}"
                                 )
-                            
-                            with edit_cols[5]:
-                                if st.button('Save Changes', type='primary', key='save_edit'):
-                                    # Combine date and time
-                                    new_datetime = datetime.combine(new_date, new_time)
-                                    
-                                    # Calculate new values
-                                    new_profit_loss = calculate_profit_loss(
-                                        new_quantity,
-                                        new_purchase_price,
-                                        transaction['Current Price']
-                                    )
-                                    
-                                    # Update transaction
-                                    updated_data = {
-                                        'Date': new_datetime.strftime('%Y-%m-%d %H:%M'),
-                                        'Quantity': new_quantity,
-                                        'Purchase Price': new_purchase_price,
-                                        'Total Cash Invested': new_total_invested,
-                                        'Profit/Loss': new_profit_loss
-                                    }
-                                    
-                                    if update_transaction(st.session_state.editing_transaction, updated_data):
-                                        st.success('Transaction updated successfully!')
-                                        st.session_state.edit_mode = False
-                                        st.session_state.editing_transaction = None
-                                        st.session_state.transactions = load_transactions()
-                                        st.rerun()
-                            
-                            with edit_cols[6]:
-                                if st.button('Cancel', type='secondary', key='cancel_edit'):
-                                    st.session_state.edit_mode = False
-                                    st.session_state.editing_transaction = None
-                                    st.rerun()
-                            
-                            st.markdown("<hr>", unsafe_allow_html=True)
-                    
-                    
-                    if not st.session_state.transactions.empty:
-                        # Update current prices if auto-refresh is enabled
-                        if auto_refresh and should_update_prices():
-                            update_current_prices()
-                        
-                        left_header_space, right_header_space, right_space = st.columns([0.1,3,6.9])
-                        with left_header_space:
-                            st.markdown("<div style='margin-left: -1.25rem;'>✨</div>", unsafe_allow_html=True)
-                        with right_header_space:
-                            st.header('Transaction Records')
-                        
-                        
-                        # Create headers
-                        col_headers = st.columns([2, 1, 2, 2, 2, 2, 2, 2, 2, 2, 2, 1, 1])
-                        headers = ['Purchase Date', 'Logo', 'Asset', 'Quantity', 'Invested Cash', 
-                                 'Purchase Price', 'Current Price', 'Chart', 'Profit/Loss', "% Yield", "Performance"]
-                        
-                        for col, header in zip(col_headers[:-1], headers):
-                            with col:
-                                # if header == '':
-                                #     st.markdown(f"""
-                                #     <div style='background-color:transparent;color:yellow;
-                                #     font-weight:bold;font-family:Tahoma;padding-top:0.25rem;padding-bottom:0.5rem;padding-left:0.1rem;
-                                #     padding-right:0.1rem;height: 4rem;box-shadow: rgba(50, 50, 93, 0.25) 0px 30px 60px -12px inset, rgba(0, 0, 0, 0.3) 0px 18px 36px -18px inset;
-                                #     border: 0rem solid #0085ca; border-radius: 0.25rem;letter-spacing:0.1rem;
-                                #     text-align:center;font-size:1rem;margin-right: 0rem;opacity: 0.8;'>
-                                #     {header}
-                                #     </div>
-                                # """, unsafe_allow_html=True)
-                                # else:
-                                st.markdown(f"""
-                                    <div style='background-color:#1965e1;color:yellow;
-                                    font-weight:bold;font-family:Tahoma;padding-top:0.25rem;padding-bottom:0.5rem;padding-left:0.1rem;
-                                    padding-right:0.1rem;height: 4rem;box-shadow: rgba(50, 50, 93, 0.25) 0px 30px 60px -12px inset, rgba(0, 0, 0, 0.3) 0px 18px 36px -18px inset;
-                                    border: 0.1rem solid #0085ca; border-radius: 0.25rem;letter-spacing:0.1rem;
-                                    text-align:center;font-size:1rem;margin-right: 0rem;opacity: 0.8;'>
-                                    {header}
-                                    </div>
-                                """, unsafe_allow_html=True)
-
-                        # Display transactions
-                        for index, row in st.session_state.transactions.iterrows():
-                            cols = st.columns([2, 1, 2, 2, 2, 2, 2, 2, 2, 2, 2, 1, 1])
-                            if index == 0:
-                                margin_value = 1
-                            elif index == len(st.session_state.transactions) - 1:
-                                margin_value = 0
-                            else:
-                                margin_value = 0
-
-                            # positive_impact = st.empty()
-                            current_price = st.session_state.current_prices.get(row['Symbol']) or get_current_price(row['Symbol'])
-                            profit_loss = calculate_profit_loss(row['Quantity'], 
-                                                                      row['Purchase Price'], 
-                                                                      current_price)
-                            performance_rate = profit_loss * 100 / row['Total Cash Invested']
-                            # Continue with the display of transaction details...
-                            # Display transaction details
-                            with cols[0]:  # Date
-                                st.markdown(f"""
-                                    <p style='margin-top:{margin_value}rem;margin-left:-0.5rem;padding-left: 2rem;font-size:15px;text-align:left;
-                                    border-left:0.5rem solid #0085ca;padding-top:8px;letter-spacing:1px;opacity: 0.8;'>
-                                    {row['Date']}</p>
-                                """, unsafe_allow_html=True)
-                            
-                            # with cols[1]:  # Asset
-                            #     st.markdown(f"""
-                            #         <p style='margin-top:{margin_value}rem;font-size:15px;text-align:center;opacity: 1;
-                            #         padding-top:.75rem;letter-spacing:0.5px;'>{row['Asset']}</p>
-                            #     """, unsafe_allow_html=True)
-
                             with cols[1]:
-                                logo_path = get_crypto_logo(row['Asset'])
-                                if logo_path and os.path.exists(logo_path):
-                                    if index == 0:
-                                        st.write('')
-                                        # st.write('')
-                                    st.image(logo_path, width=40)
-                                else:
-                                    st.write("")  # Empty space for alignment
-                            with cols[2]:
-                                # row['Asset'] = re.sub("\s\(.*\)", "", row['Asset'])
-                                if index == 0:
-                                    st.markdown(f"""
-                                    <div style='padding-top: 0rem; margin-top: 1.75rem;text-align: left;margin-left: 0.5rem;'>
-                                        <span style='font-size:16px;opacity:0.8;
-                                        letter-spacing:0.5px;'>{row['Asset']}</span>
-                                    </div>
-                                """, unsafe_allow_html=True)
-                                else:                          
-                                    # margin_top_value = '2rem' if len(row['Asset']) >= 15 else '2rem'
-                                    st.markdown(f"""
-                                        <div style='padding-top: 0rem; margin-top: 0.65rem; margin-bottom: 0.5rem;text-align: left;margin-left: 0.5rem;'>
-                                            <span style='font-size:15px;opacity:0.8; white-space: nowrap;
-                                            letter-spacing:0.5px;'>{row['Asset']}</span>
-                                        </div>
-                                    """, unsafe_allow_html=True)
-
-                                
-                            
-                            with cols[3]:  # Quantity
-                                st.markdown(f"""
-                                    <p style='margin-top:{margin_value}rem;font-size:16px;text-align:center;opacity: 0.8;
-                                    padding-top:0.8rem;letter-spacing:1px;'>{row['Quantity']:.3f}</p>
-                                """, unsafe_allow_html=True)
-                            
-                            with cols[4]:  # Total Cash Invested
-                                st.markdown(f"""
-                                    <p style='margin-top:{margin_value}rem;text-align:right;font-size:20px;padding-right: 1rem;opacity: 0.8;\
-                                    box-shadow: white 0px 10px 10px -25px inset, white 0px 18px 36px -29px inset;border: 0.5px solid white;border-radius: 5px;
-                                    padding-top:0.5rem;padding-bottom:0.5rem;letter-spacing:1px;'>{format_round_currency(row['Total Cash Invested'])}</p>
-                                """, unsafe_allow_html=True)
-                            
-                            with cols[5]:  # Purchase Price
-                                purchase_price = row['Purchase Price']
-                                st.markdown(f"""
-                                    <p style='margin-top:{margin_value}rem;text-align:right;font-size:20px;padding-right: 1rem;opacity: 0.7;
-                                    padding-top:0.5rem;letter-spacing:1px;'>{format_currency(row['Purchase Price'])}</p>
-                                """, unsafe_allow_html=True)
-                            
-                            with cols[6]:  # Current Price
-                                current_price = st.session_state.current_prices.get(row['Symbol']) or get_current_price(row['Symbol'])
-                                if current_price:
-                                    color = '#0fe6d2' if current_price >= row['Purchase Price'] else '#dd3342'
-                                    st.markdown(f"""
-                                        <p style='margin-top:{margin_value}rem;text-align:right;font-size:20px;padding-top:0.6rem;padding-right: 1rem;
-                                        color:{color};letter-spacing:1.5px;'>
-                                        {format_currency(current_price)}</p>
-                                    """, unsafe_allow_html=True)
-                                else:
-                                    st.markdown(f"<p style='margin-top:{margin_value}rem;'>Price unavailable</p>", 
-                                              unsafe_allow_html=True)
-                            
-                            with cols[7]:
-                                try:
-                                    if index == 0:
-                                        st.write('')
-                                    if 'Symbol' in row:
-                                        dates, prices = get_coin_price_history(
-                                            row['Symbol'].lower(), 
-                                            days=st.session_state.chart_days
-                                        )
-                                        if dates and prices:
-                                            current_price = st.session_state.current_prices.get(row['Symbol'])
-                                            fig = create_sparkline(
-                                                dates, 
-                                                prices, 
-                                                current_price, 
-                                                row['Purchase Price']
-                                            )
-                                            if fig:
-                                                st.plotly_chart(fig, use_container_width=True, key=f"chart_{index}")
-                                            else:
-                                                st.write("No data")
-                                        else:
-                                            st.write("No data")
-                                except Exception as e:
-                                    st.write(f"Chart error: {e}")
-
-
-                            with cols[8]:  # Profit/Loss
-                                if current_price:
-                                    profit_loss = calculate_profit_loss(row['Quantity'], 
-                                                                      row['Purchase Price'], 
-                                                                      current_price)
-                                    color = '#00ff00' if profit_loss > 0 else '#c80c20'
-                                    background_color = "#075f00" if profit_loss > 0 else '#ec124e'
-                                    st.markdown(f"""
-                                        <p style='margin-top:{margin_value}rem;margin-left:0.15rem;text-align:right;font-size:20px;font-weight:400;padding-right: 0.5rem;padding-top:0.5rem;padding-bottom:0.5rem;\
-                                                border-radius: 5px; border: 0.5px solid {background_color}; width: 100%; font-weight: 500;box-shadow: {background_color} 0px 10px 10px -29px inset, {background_color} 0px 18px 36px -28px inset;
-                                        color:{color};letter-spacing:2px;background-color:transparent;'>
-                                        {format_currency(profit_loss)}</p>
-                                    """, unsafe_allow_html=True)
-                                else:
-                                    st.markdown(f"<p style='margin-top:{margin_value}rem;'>-</p>", 
-                                              unsafe_allow_html=True)
-                            with cols[9]: # % Yield
-                                if current_price:
-                                    # import numpy as np
-                                    profit_loss = calculate_profit_loss(row['Quantity'], 
-                                                                      row['Purchase Price'], 
-                                                                      current_price)
-                                    performance_rate = profit_loss * 100 / row['Total Cash Invested']
-                                    positive_impact = performance_rate
-                                    color = '#00ff00' if profit_loss > 0 else '#c80c20'
-                                    background_color = "#075f00" if profit_loss > 0 else '#ec124e'
-                                    # icon = '📈' if profit_loss > 0 else '📉'
-
-                                    st.markdown(f"""
-                                        <p style='margin-top:{margin_value}rem;text-align:right;font-size:20px;font-weight:500;padding-right: 0.5rem;padding-top:0.5rem;padding-bottom:0.5rem;\
-                                                border-radius: 5px; border: 0.5px solid {background_color}; box-shadow: {background_color} 0px 10px 10px -29px inset, {background_color} 0px 18px 36px -29px inset;
-                                        color:{color};letter-spacing:2px;background-color: transparent;'>
-                                        {np.round(performance_rate,2)}%</p>
-                                    """, unsafe_allow_html=True)
-                                else:
-                                    st.markdown(f"<p style='margin-top:{margin_value}rem;'>-</p>", 
-                                              unsafe_allow_html=True)
-                            
-                            with cols[10]:  # Performance column
-                                if current_price:
-                                    if index == 0:
-                                        st.write("")
-                                    profit_loss = calculate_profit_loss(row['Quantity'], 
-                                                                    row['Purchase Price'], 
-                                                                    current_price)
-                                    performance_rate = profit_loss * 100 / row['Total Cash Invested']
-                                    st.markdown(create_percentage_bar(performance_rate), unsafe_allow_html=True)
-
-                            with cols[11]:  # Edit/Delete Buttons
-                                if index == 0:
-                                    st.write('')
-                                st.markdown(f"""<style>
-                                            .stElementContainer.element-container.st-key-edit_{row['id']}
-                                                {{
-                                                    margin-top: -1.1rem;
-                                                    margin-left: -0.5rem;
-                                                    padding: .9rem;
-                                                    padding-top: 0.4rem;
-                                                    padding-bottom: 0.4rem;
-                                                    border-radius: 5px;
-                                            }}                                  
-                                </style>""", unsafe_allow_html=True)
-                                # st.write('<div style="margin-top: -2rem;"></div>', unsafe_allow_html=True)
-                                if st.button('✏️', key=f"edit_{row['id']}"):
-                                    st.session_state.editing_transaction = row['id']
-                                    st.session_state.edit_mode = True
-                                    st.rerun()
-
-                            with cols[12]:
-                                if index == 0:
-                                    st.write('')
-                                st.markdown(f"""<style>
-                                            .stElementContainer.element-container.st-key-delete_{row['id']}
-                                                {{
-                                                    margin-top: -1.1rem;
-                                                    margin-left: -1.25rem;
-                                                    padding: .9rem;
-                                                    padding-top: 0.4rem;
-                                                    padding-bottom: 0.4rem;
-                                                    border-radius: 5px;
-                                            }}                                  
-                                </style>""", unsafe_allow_html=True)
-                                if st.button('🗑️', key=f"delete_{row['id']}"):
-                                    if delete_transaction(row['id']):
-                                        st.success("Transaction deleted!")
-                                        st.session_state.transactions = load_transactions()
-                                        st.rerun()
-                        
-                            # Separator lines
-                            if index == len(st.session_state.transactions) - 1:
-                                st.markdown(f"""
-                                    <hr style='margin-top:{margin_value}rem;margin-bottom:0rem;
-                                    border:0.1px solid transparent;box-shadow:0px 20px 40px yellow;'>
-                                """, unsafe_allow_html=True)
-                            else:
-                                st.markdown(f"""
-                                    <hr style='margin-top:{0}rem;margin-bottom:0rem;border: 0.25px dash white;'>
-                                """, unsafe_allow_html=True)
-
-                        
-                        
-                            
-                        
-                        # Calculate and display summary statistics
-                        st.write("")
-                        st.write("")
-                        left_space, col1, middle_space, col2, col3, col4, right_space = st.columns([1,10,5,10,10,10, 1])
-                        
-                        # st.markdown('<div style=""></div>', unsafe_allow_html=True)
-                        # st.markdown('<div style=""></div>', unsafe_allow_html=True)
-                        with col1:
-                            total_investment = st.session_state.transactions['Total Cash Invested'].sum()
-                            
-                            # st.markdown('<div class="total-cash-invested" >', unsafe_allow_html=True)
-                            # st.metric(
-                            #     label="Total Cash Invested",
-                            #     value=format_currency(total_investment),
-                            #     delta=total_investment,
-                            #     delta_color="off"
-                            # )
-
-                            # st.markdown('</div>', unsafe_allow_html=True)
-                            # Instead of using st.metric, use custom HTML
-                            st.markdown(f"""
-                                <div style='padding: 0rem; letter-spacing: 2px;margin-top:0.1rem;opacity:0.7;'>
-                                    <p style='color: white; font-size: 14px; margin-bottom: 0.5rem; '>Total Cash Invested</p>
-                                    <p style='font-size: 2rem; margin-top:-0.5rem;font-size: 36px; font-weight: 700;'>{format_currency(total_investment)}</p>
-                                </div>
-                            """, unsafe_allow_html=True)
-                        
-                        with col2:
-                            actual_cash_yield = sum(
-                                calculate_profit_loss(
-                                    row['Quantity'],
-                                    row['Purchase Price'],
-                                    st.session_state.current_prices.get(row['Symbol']) or row['Current Price']
-                                ) + row['Total Cash Invested']
-                                for _, row in st.session_state.transactions.iterrows()
-                            )
-                            
-                            actual_profit_loss = actual_cash_yield - total_investment
-                            perc_yield = actual_profit_loss / total_investment
-                            if perc_yield > 0.3:
-                                emoji = "🎉"*4 + "✈️"*4
-                            elif perc_yield > 0.2:
-                                emoji = "🎉 😍 🚀 ✈️"
-                            elif perc_yield > 0.15:
-                                emoji = "🎉 😍 🚀"
-                            elif perc_yield > 0.1:
-                                emoji = "🎉 😍"
-                            elif perc_yield > 0.05:
-                                emoji = "🎉"
-                            else:
-                                emoji = "💥"
-                            st.metric(
-                                label="Actual Cash Yield",
-                                value=format_currency(actual_cash_yield),
-                                delta=emoji
-                            )
-                        
-                        with col3:
-                            total_profit_loss = sum(
-                                calculate_profit_loss(
-                                    row['Quantity'],
-                                    row['Purchase Price'],
-                                    st.session_state.current_prices.get(row['Symbol']) or row['Current Price']
+                                st.metric(
+                                    "New Investment",
+                                    f"${new_invested:,.2f}",
+                                    delta=f"-${profit_data['total_invested'] - new_invested:,.2f}"
                                 )
-                                for _, row in st.session_state.transactions.iterrows()
-                            )
                             
-                            formatted_profit_loss = format_currency(abs(total_profit_loss))
-                            if total_profit_loss < 0:
-                                formatted_profit_loss = f"-{formatted_profit_loss}"
-                                color = "inverse"
-                            else:
-                                color = "normal"
+                            # Market Value & P/L
+                            st.markdown("#### Market Value & P/L")
+                            new_market_value = new_quantity * profit_data['current_price']
+                            new_profit_loss = new_market_value - new_invested
                             
-                            st.metric(
-                                label="Total Profit/Loss",
-                                value=formatted_profit_loss,
-                                delta=formatted_profit_loss,
-                                delta_color=color
-                            )
-
-                        with col4:
-                            if total_investment and total_profit_loss:
-                                actual_percentage_yield = total_profit_loss * 100 / total_investment
-                                formatted_perc_yield= np.round(actual_percentage_yield,2)
-                                if total_profit_loss < 0:
-                                    formatted_perc_yield = f"{formatted_perc_yield} %"
-                                    color = "inverse"
-                                else:
-                                    formatted_perc_yield = f"{formatted_perc_yield} %"
-                                    color = "normal"
-                                
+                            cols = st.columns(2)
+                            with cols[0]:
                                 st.metric(
-                                    label="Actual % Yield",
-                                    value=formatted_perc_yield,
-                                    delta=formatted_perc_yield,
-                                    delta_color=color
+                                    "Market Value",
+                                    f"${profit_data['current_value']:,.2f}"
                                 )
-                            else:
+                            with cols[1]:
                                 st.metric(
-                                    label="Actual % Yield",
-                                    value=0,
-                                    delta='normal'
-                                )
-                        
-
-                        
-
-                        st.write("")
-                        # Asset summary
-                        st.markdown("""
-                            <hr style='margin-top:1.5rem;margin-bottom:1.5rem;
-                            border:0.5px solid transparent;box-shadow:0px -30px 40px yellow;'>
-                        """, unsafe_allow_html=True)
-                        
-                        st.subheader('Profit/Loss by Asset')
-                        asset_summary = pd.DataFrame()
-                        if not st.session_state.transactions.empty:
-                            summary_data = []
-                            for asset in st.session_state.transactions['Asset'].unique():
-                                asset_transactions = st.session_state.transactions[
-                                    st.session_state.transactions['Asset'] == asset
-                                ]
-                                
-                                total_invested = asset_transactions['Total Cash Invested'].sum()
-                                profit_loss = sum(
-                                    calculate_profit_loss(
-                                        row['Quantity'],
-                                        row['Purchase Price'],
-                                        st.session_state.current_prices.get(row['Symbol']) or row['Current Price']
-                                    )
-                                    for _, row in asset_transactions.iterrows()
+                                    "New Market Value",
+                                    f"${new_market_value:,.2f}",
+                                    delta=f"-{withdrawal_amount:,.2f}"
                                 )
-                                actual_yield = total_invested + profit_loss
-                                
-                                summary_data.append({
-                                    'Asset': asset,
-                                    'Total Cash Invested': total_invested,
-                                    'Profit/Loss': profit_loss,
-                                    'Actual Cash Yield': actual_yield
-                                })
                             
-                            asset_summary = pd.DataFrame(summary_data)
-                        
-                        if not asset_summary.empty:
-                            st.dataframe(
-                                asset_summary,
-                                column_config={
-                                    'Total Cash Invested': st.column_config.NumberColumn(
-                                        'Total Cash Invested',
-                                        help='Total amount invested',
-                                        format="$%.2f",
-                                    ),
-                                    'Profit/Loss': st.column_config.NumberColumn(
-                                        'Profit/Loss',
-                                        help='Current profit or loss',
-                                        format="$%.2f",
-                                    ),
-                                    'Actual Cash Yield': st.column_config.NumberColumn(
-                                        'Actual Cash Yield',
-                                        help='The Actual Return Cash yielded from investment',
-                                        format="$%.2f",
-                                    ),
-                                },
-                                hide_index=True,
-                                use_container_width=True
+                            pl_color = "normal" if new_profit_loss >= 0 else "inverse"
+                            st.metric(
+                                "New Profit/Loss",
+                                f"${new_profit_loss:,.2f}",
+                                delta=f"${new_profit_loss:,.2f}",
+                                delta_color=pl_color
                             )
-                        
-                        # Control buttons
-                        # st.markdown("<hr style='margin-top:2rem;margin-bottom:2rem;border:1px solid #2d3436;'>",
-                        #           unsafe_allow_html=True)
-                        
-                        left_button_space, col1, col2, right_button_space = st.columns([4,3,3,4])
-                        with col1:
-                            if st.button('Refresh Prices', key="reset_button", type="secondary"):
-                                st.rerun()
-                        
-                        with col2:
-                            if st.button('Clear All Transactions', type="secondary", key="clear_transactions"):
-                                clear_transactions()
-                                st.session_state.transactions = load_transactions()
-                                st.success('All transactions cleared!')
-
-
-            # Add this to your main app
-            st.markdown("<hr>", unsafe_allow_html=True)
-            st.header("New Balance if Withdrawal")
-
-            if not st.session_state.transactions.empty:
-                unique_coins = st.session_state.transactions['Asset'].unique()
-                
-                col1, col2 = st.columns([3, 7])
-                
-                with col1:
-                    selected_coin = st.selectbox(
-                        "Select Coin to Withdraw",
-                        options=unique_coins,
-                        key="withdrawal_coin"
-                    )
-                    
-                    profit_data = calculate_profit_withdrawal_options(
-                        st.session_state.transactions,
-                        selected_coin
-                    )
-                    
-                    if profit_data and profit_data['total_profit'] > 0:
-                        # Show total profit
-                        st.metric(
-                            "Total Profit Available",
-                            f"${profit_data['total_profit']:,.2f}",
-                            help="Current profit for selected coin"
-                        )
-                        
-                        # Reference targets
-                        st.markdown("### Reference Targets")
-                        ref_cols = st.columns(5)
-                        for i, (label, data) in enumerate(profit_data['reference_targets'].items()):
-                            with ref_cols[i]:
-                                st.markdown(f"""
-                                    <div style='text-align: center; border: 1px solid rgba(255,255,255,0.1); 
-                                    padding: 5px; border-radius: 5px;'>
-                                        <div style='font-size: 0.8em; color: rgba(255,255,255,0.6);'>{label}</div>
-                                        <div style='font-size: 0.9em;'>${data['amount']:,.2f}</div>
-                                    </div>
-                                """, unsafe_allow_html=True)
-                        
-                        # Custom withdrawal input
-                        st.markdown("### Custom Withdrawal")
-                        withdrawal_amount = st.number_input(
-                            "Enter withdrawal amount ($)",
-                            min_value=0.0,
-                            max_value=float(profit_data['total_profit']),
-                            value=0.0,
-                            step=100.0,
-                            key="custom_withdrawal"
-                        )
-                        
-                        # Show percentage of profit
-                        if withdrawal_amount > 0:
-                            withdrawal_percentage = (withdrawal_amount / profit_data['total_profit']) * 100
-                            withdrawal_coins = withdrawal_amount / profit_data['current_price']
-                            st.markdown(f"""
-                                <div style='margin-top: 10px;'>
-                                    <span style='color: rgba(255,255,255,0.6);'>This represents:</span><br/>
-                                    • {withdrawal_percentage:.1f}% of your profit<br/>
-                                    • {withdrawal_coins:.4f} coins
-                                </div>
-                            """, unsafe_allow_html=True)
-                        
-
-                        
-                        if st.button("Calculate New Balance", type="secondary", key="calculate_new_balance"):
-                            if withdrawal_amount > 0:
-                                with col2:
-                                    withdrawal_coins = withdrawal_amount / profit_data['current_price']
-                                    st.markdown("### Impact Analysis")
-                                    
-                                    # Holdings
-                                    st.markdown("#### Holdings")
-                                    cols = st.columns(2)
-                                    with cols[0]:
-                                        st.metric(
-                                            "Original Quantity",
-                                            f"{profit_data['total_quantity']:.4f}"
-                                        )
-                                    with cols[1]:
-                                        new_quantity = profit_data['total_quantity'] - withdrawal_coins
-                                        st.metric(
-                                            "New Quantity",
-                                            f"{new_quantity:.4f}",
-                                            delta=f"-{withdrawal_coins:.4f}"
-                                        )
-                                    
-                                    # Investment Values
-                                    st.markdown("#### Investment")
-                                    withdrawal_ratio = withdrawal_coins / profit_data['total_quantity']
-                                    new_invested = profit_data['total_invested'] * (1 - withdrawal_ratio)
-                                    
-                                    cols = st.columns(2)
-                                    with cols[0]:
-                                        st.metric(
-                                            "Original Investment",
-                                            f"${profit_data['total_invested']:,.2f}"
-                                        )
-                                    with cols[1]:
-                                        st.metric(
-                                            "New Investment",
-                                            f"${new_invested:,.2f}",
-                                            delta=f"-${profit_data['total_invested'] - new_invested:,.2f}"
-                                        )
-                                    
-                                    # Market Value & P/L
-                                    st.markdown("#### Market Value & P/L")
-                                    new_market_value = new_quantity * profit_data['current_price']
-                                    new_profit_loss = new_market_value - new_invested
-                                    
-                                    cols = st.columns(2)
-                                    with cols[0]:
-                                        st.metric(
-                                            "Market Value",
-                                            f"${profit_data['current_value']:,.2f}"
-                                        )
-                                    with cols[1]:
-                                        st.metric(
-                                            "New Market Value",
-                                            f"${new_market_value:,.2f}",
-                                            delta=f"-{withdrawal_amount:,.2f}"
-                                        )
-                                    
-                                    pl_color = "normal" if new_profit_loss >= 0 else "inverse"
-                                    st.metric(
-                                        "New Profit/Loss",
-                                        f"${new_profit_loss:,.2f}",
-                                        delta=f"${new_profit_loss:,.2f}",
-                                        delta_color=pl_color
-                                    )
-                    else:
-                        st.warning("No profit available for withdrawal on this coin")
             else:
-                st.info("No transactions available. Add some transactions to use this feature.")
-
+                st.warning("No profit available for withdrawal on this coin")
+    else:
+        st.info("No transactions available. Add some transactions to use this feature.")
 
-            if auto_refresh:
-                time.sleep(60)  # Wait for 60 second before next update
-                st.rerun()
-            else:
-                break
-                
-        except Exception as e:
-            st.error(f"An error occurred: {str(e)}")
-            time.sleep(15)
-            continue
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
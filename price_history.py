@@ -0,0 +1,46 @@
+import numpy as np
+
+
+class PriceHistory:
+    """Price history stored as columns.
+
+    Timestamps are int64 epoch milliseconds and prices are float64 arrays,
+    so charts can take them directly without per-candle Python objects.
+    Instances are shared through the history cache, treat them as read-only.
+    """
+
+    __slots__ = ('ts', 'open', 'high', 'low', 'close')
+
+    def __init__(self, ts, open, high, low, close):
+        self.ts = ts
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Build from candle store rows (ts, open, high, low, close, ...) in one conversion"""
+        if not rows:
+            empty = np.empty(0)
+            return cls(np.empty(0, dtype=np.int64), empty, empty, empty, empty)
+        # None (e.g. no OHLC for a market_chart point) becomes NaN
+        table = np.array([row[:5] for row in rows], dtype=float)
+        return cls(table[:, 0].astype(np.int64), table[:, 1], table[:, 2], table[:, 3], table[:, 4])
+
+    def __len__(self):
+        return len(self.ts)
+
+    @property
+    def dates(self):
+        """Timestamps as datetime64[ms], which Plotly plots as dates"""
+        return self.ts.astype('datetime64[ms]')
+
+    @property
+    def ohlc(self):
+        """(n, 4) array of open, high, low, close"""
+        return np.column_stack([self.open, self.high, self.low, self.close])
+
+    @property
+    def last_ts(self):
+        return int(self.ts[-1]) if len(self.ts) else None
@@ -0,0 +1,236 @@
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+from coingecko_client import api_url, http_get
+from database import get_connection
+from resources import shared_resource
+
+# Number of coin ids sent per /simple/price request
+PRICE_BATCH_SIZE = 100
+
+# Seconds between two refreshes of the shared prices
+REFRESH_INTERVAL = 60
+
+# Prices older than this are served at once but trigger a background refresh
+SOFT_TTL = 1.5 * REFRESH_INTERVAL
+
+# Lookups block (up to their timeout) for prices older than this
+HARD_TTL = 5 * REFRESH_INTERVAL
+
+# Sessions that have not registered their coins for this long are dropped
+WATCH_TTL = 5 * REFRESH_INTERVAL
+
+# A price and the time.time() it was fetched at
+PriceEntry = namedtuple('PriceEntry', ['price', 'fetched_at'])
+
+
+def fetch_current_prices(coin_ids):
+    """Fetch current USD prices for several coins, one /simple/price request per chunk of ids"""
+    coin_ids = list(dict.fromkeys(coin_id for coin_id in coin_ids if coin_id))
+    prices = {}
+    for start in range(0, len(coin_ids), PRICE_BATCH_SIZE):
+        chunk = coin_ids[start:start + PRICE_BATCH_SIZE]
+        try:
+            response = http_get(
+                api_url('/simple/price'),
+                params={'ids': ','.join(chunk), 'vs_currencies': 'usd'},
+                timeout=5  # Add timeout to prevent hanging
+            )
+            if response.status_code == 200:
+                data = response.json()
+                for coin_id in chunk:
+                    price = data.get(coin_id, {}).get('usd')
+                    if price is not None:
+                        prices[coin_id] = price
+            else:
+                print(f"Failed to fetch prices: Status {response.status_code}")
+        except Exception as e:
+            print(f"Error fetching prices: {e}")
+    return prices
+
+
+def init_price_table(db_path=None):
+    """Create the table holding the latest price of each coin"""
+    try:
+        conn = get_connection(db_path)
+        with conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS prices
+                (coin_id TEXT PRIMARY KEY,
+                 price REAL,
+                 fetched_at REAL)
+            ''')
+    except sqlite3.Error as e:
+        print(f"Error creating prices table: {e}")
+
+def load_price_snapshot(db_path=None):
+    """Load the last known price of every coin as PriceEntry values"""
+    init_price_table(db_path)
+    try:
+        rows = get_connection(db_path).execute("SELECT coin_id, price, fetched_at FROM prices").fetchall()
+        return {coin_id: PriceEntry(price, fetched_at) for coin_id, price, fetched_at in rows}
+    except sqlite3.Error as e:
+        print(f"Error loading price snapshot: {e}")
+        return {}
+
+def save_price_snapshot(entries, db_path=None):
+    """Write the latest PriceEntry of each coin, replacing older snapshots"""
+    if not entries:
+        return
+    try:
+        conn = get_connection(db_path)
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO prices (coin_id, price, fetched_at) VALUES (?, ?, ?)",
+                [(coin_id, entry.price, entry.fetched_at) for coin_id, entry in entries.items()]
+            )
+    except sqlite3.Error as e:
+        print(f"Error saving price snapshot: {e}")
+
+
+class PriceStore:
+    """Current prices shared by every session of the server process.
+
+    Sessions register the coins they display with ``watch`` and only read
+    prices back; a single background thread refreshes the union of all
+    watched coins every ``refresh_interval`` seconds.
+
+    Reads are stale-while-revalidate: prices younger than ``soft_ttl`` are
+    returned as is, older ones are returned at once while the refresher is
+    woken, and only prices past ``hard_ttl`` (or never fetched) make the
+    reader wait for the refresh.
+
+    The latest prices are also written to the ``prices`` table so that a
+    restarted server paints the first render with last-known prices.
+    """
+
+    def __init__(self, refresh_interval=REFRESH_INTERVAL, soft_ttl=SOFT_TTL, hard_ttl=HARD_TTL,
+                 watch_ttl=WATCH_TTL, db_path=None):
+        self.db_path = db_path
+        self.refresh_interval = refresh_interval
+        self.soft_ttl = soft_ttl
+        self.hard_ttl = hard_ttl
+        self.watch_ttl = watch_ttl
+        self.prices = {}  # coin id -> PriceEntry
+        self.requested = set()  # coin ids already sent to the API at least once
+        self.restored = set()  # coin ids loaded from the snapshot and not refreshed yet
+        self.watchers = {}  # session id -> (coin ids, last seen)
+        self._condition = threading.Condition()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def load_snapshot(self):
+        """Seed the store with the prices saved by previous runs"""
+        snapshot = load_price_snapshot(self.db_path)
+        with self._condition:
+            for coin_id, entry in snapshot.items():
+                if coin_id not in self.prices:
+                    self.prices[coin_id] = entry
+                    self.restored.add(coin_id)
+        return snapshot
+
+    def start(self):
+        """Start the background refresher thread if it is not running yet"""
+        init_price_table(self.db_path)
+        with self._condition:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="price-store-refresher", daemon=True
+                )
+                self._thread.start()
+
+    def watch(self, session_id, coin_ids):
+        """Register the coins displayed by a session, waking the refresher for unknown ones"""
+        coin_ids = frozenset(coin_id for coin_id in coin_ids if coin_id)
+        with self._condition:
+            self.watchers[session_id] = (coin_ids, time.time())
+            if any(coin_id not in self.requested for coin_id in coin_ids):
+                self._wake.set()
+
+    def unwatch(self, session_id):
+        """Stop refreshing the coins of a session"""
+        with self._condition:
+            self.watchers.pop(session_id, None)
+
+    def watched_coins(self):
+        """Union of the coins watched by all live sessions"""
+        now = time.time()
+        with self._condition:
+            expired = [session_id for session_id, (_, last_seen) in self.watchers.items()
+                       if now - last_seen > self.watch_ttl]
+            for session_id in expired:
+                del self.watchers[session_id]
+            return set().union(*(coin_ids for coin_ids, _ in self.watchers.values()))
+
+    def _must_wait(self, coin_id, now):
+        entry = self.prices.get(coin_id)
+        if entry is None:
+            # Don't wait for coins the API already failed to price
+            return coin_id not in self.requested
+        # Last-known prices from the snapshot are shown while the refresh runs
+        if coin_id in self.restored:
+            return False
+        return now - entry.fetched_at >= self.hard_ttl
+
+    def get_entries(self, coin_ids, timeout=0):
+        """Get PriceEntry values for the given coins, stale-while-revalidate.
+
+        Waits up to timeout seconds only for coins that have no price yet or
+        whose price is older than the hard TTL.
+        """
+        coin_ids = [coin_id for coin_id in coin_ids if coin_id]
+        deadline = time.time() + timeout
+        with self._condition:
+            now = time.time()
+            if any(coin_id not in self.prices or now - self.prices[coin_id].fetched_at >= self.soft_ttl
+                   for coin_id in coin_ids):
+                self._wake.set()
+            while True:
+                now = time.time()
+                remaining = deadline - now
+                if remaining <= 0 or not any(self._must_wait(coin_id, now) for coin_id in coin_ids):
+                    break
+                self._condition.wait(remaining)
+            return {coin_id: self.prices[coin_id] for coin_id in coin_ids if coin_id in self.prices}
+
+    def get_prices(self, coin_ids, timeout=0):
+        """Get the known prices of the given coins, see get_entries"""
+        return {coin_id: entry.price for coin_id, entry in self.get_entries(coin_ids, timeout).items()}
+
+    def refresh(self):
+        """Fetch prices for every watched coin and publish them to readers"""
+        coin_ids = self.watched_coins()
+        if not coin_ids:
+            return {}
+        # Fetch missing and oldest prices first so they are served quickly
+        ordered = sorted(coin_ids, key=lambda coin_id: self.prices.get(coin_id, PriceEntry(None, 0)).fetched_at)
+        prices = fetch_current_prices(ordered)
+        fetched_at = time.time()
+        entries = {coin_id: PriceEntry(price, fetched_at) for coin_id, price in prices.items()}
+        with self._condition:
+            self.requested.update(coin_ids)
+            self.restored.difference_update(entries)
+            self.prices.update(entries)
+            self._condition.notify_all()
+        save_price_snapshot(entries, self.db_path)
+        return prices
+
+    def _run(self):
+        while True:
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Error refreshing prices: {e}")
+            self._wake.wait(self.refresh_interval)
+            self._wake.clear()
+
+
+@shared_resource
+def get_price_store():
+    """Get the process-wide price store, starting its refresher thread once"""
+    store = PriceStore()
+    store.load_snapshot()
+    store.start()
+    return store
@@ -0,0 +1,194 @@
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+from resources import shared_resource
+
+# (max calls, time window in seconds) for each CoinGecko endpoint family
+ENDPOINT_BUDGETS = {
+    'simple_price': (30, 60),
+    'market_chart': (20, 60),
+    'ohlc': (20, 60),
+    'search': (10, 60),
+    'coin': (10, 60),
+    'default': (10, 60),
+}
+
+# Budget shared by all endpoints, CoinGecko counts every call against one quota
+GLOBAL_BUDGET = (50, 60)
+
+# Backoff used when a 429 response carries no Retry-After header
+BASE_BACKOFF = 2
+MAX_BACKOFF = 120
+
+ENDPOINT_PATTERNS = [
+    ('simple_price', re.compile(r'^/simple/price/?$')),
+    ('market_chart', re.compile(r'^/coins/[^/]+/market_chart(/range)?/?$')),
+    ('ohlc', re.compile(r'^/coins/[^/]+/ohlc/?$')),
+    ('search', re.compile(r'^/search/?$')),
+    ('coin', re.compile(r'^/coins/(?!list/?$|markets/?$)[^/]+/?$')),
+]
+
+
+class RateLimitError(Exception):
+    """Raised when a call waited longer than its timeout for a rate limit slot"""
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at max_calls per time_window seconds.
+
+    Callers that find the bucket empty wait in FIFO order instead of being
+    turned away, and ``pause`` blocks the bucket entirely, for example while
+    the API asks us to back off after a 429.
+    """
+
+    def __init__(self, max_calls, time_window):
+        self.capacity = max_calls
+        self.rate = max_calls / time_window
+        self.tokens = float(max_calls)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._waiters = deque()
+        self._condition = threading.Condition()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def _wait_time(self, now):
+        """Seconds until the head of the queue can take a token"""
+        if now < self.paused_until:
+            return self.paused_until - now
+        if self.tokens >= 1:
+            return 0
+        return (1 - self.tokens) / self.rate
+
+    def acquire(self, timeout=None):
+        """Take one token, queueing behind earlier callers; False if timeout expires first"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        ticket = object()
+        with self._condition:
+            self._waiters.append(ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    # Only the head of the queue may take a token
+                    is_head = self._waiters[0] is ticket
+                    wait = self._wait_time(now) if is_head else None
+                    if is_head and wait == 0:
+                        self.tokens -= 1
+                        return True
+                    if deadline is not None:
+                        remaining = deadline - now
+                        if remaining <= 0:
+                            return False
+                        wait = remaining if wait is None else min(wait, remaining)
+                    # Waiters behind the head are woken when it leaves the queue
+                    self._condition.wait(wait)
+            finally:
+                self._waiters.remove(ticket)
+                self._condition.notify_all()
+
+    def refund(self):
+        """Give back a token that was taken but not used"""
+        with self._condition:
+            self._refill(time.monotonic())
+            self.tokens = min(self.capacity, self.tokens + 1)
+            self._condition.notify_all()
+
+    def available(self):
+        """Tokens that could be taken right now without waiting, 0 while paused or callers queue"""
+        with self._condition:
+            now = time.monotonic()
+            if now < self.paused_until or self._waiters:
+                return 0.0
+            self._refill(now)
+            return self.tokens
+
+    def pause(self, seconds):
+        """Hand out no tokens for the next seconds and drain the bucket"""
+        with self._condition:
+            now = time.monotonic()
+            self.paused_until = max(self.paused_until, now + seconds)
+            self.tokens = 0.0
+            self.updated = now
+            self._condition.notify_all()
+
+
+class RateLimiter:
+    """Per-endpoint token buckets plus a global one, with 429 backoff"""
+
+    def __init__(self, budgets=ENDPOINT_BUDGETS, global_budget=GLOBAL_BUDGET):
+        self.buckets = {name: TokenBucket(*budget) for name, budget in budgets.items()}
+        self.global_bucket = TokenBucket(*global_budget)
+        self.consecutive_429 = 0
+        self._lock = threading.Lock()
+
+    def endpoint(self, path):
+        """Name of the budget an API path such as '/coins/bitcoin/ohlc' is charged to"""
+        path = path.split('?', 1)[0]
+        for name, pattern in ENDPOINT_PATTERNS:
+            if pattern.match(path):
+                return name
+        return 'default'
+
+    def acquire(self, path, timeout=None):
+        """Wait for a slot in both the endpoint and the global budget"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        bucket = self.buckets[self.endpoint(path)]
+        if not bucket.acquire(timeout):
+            return False
+        remaining = None if deadline is None else max(0, deadline - time.monotonic())
+        if not self.global_bucket.acquire(remaining):
+            # No call is made, so the endpoint slot goes back to the budget
+            bucket.refund()
+            return False
+        return True
+
+    def headroom(self, path):
+        """Calls that could be made to path right now without queueing"""
+        return min(self.buckets[self.endpoint(path)].available(), self.global_bucket.available())
+
+    def record_response(self, status_code, retry_after=None):
+        """Back every bucket off after a 429, honouring Retry-After when present"""
+        with self._lock:
+            if status_code != 429:
+                self.consecutive_429 = 0
+                return 0
+            self.consecutive_429 += 1
+            delay = parse_retry_after(retry_after)
+            if delay is None:
+                delay = min(MAX_BACKOFF, BASE_BACKOFF * 2 ** (self.consecutive_429 - 1))
+        # The quota is per client, so a 429 on one endpoint pauses all of them
+        self.global_bucket.pause(delay)
+        for bucket in self.buckets.values():
+            bucket.pause(delay)
+        print(f"Rate limited by API, backing off for {delay:.0f}s")
+        return delay
+
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+@shared_resource
+def get_rate_limiter():
+    """Get the limiter shared by every session, page and background thread of the process"""
+    return RateLimiter()
@@ -0,0 +1,26 @@
+import functools
+import threading
+
+
+def shared_resource(factory):
+    """Decorator running factory once per distinct arguments and sharing the result process-wide.
+
+    Like st.cache_resource, but safe to call from the background threads the
+    helpers run on: it needs no script run context, and once the object exists
+    a call costs one dict lookup.
+    """
+    instances = {}
+    lock = threading.Lock()
+
+    @functools.wraps(factory)
+    def get(*args):
+        try:
+            return instances[args]
+        except KeyError:
+            pass
+        with lock:
+            if args not in instances:
+                instances[args] = factory(*args)
+            return instances[args]
+
+    return get
@@ -0,0 +1,70 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """Coalesce identical in-flight calls into one.
+
+    The first caller for a key runs the call; callers arriving while it is in
+    flight wait on the same future and get its result (or exception). Sync
+    callers from session threads and async callers on the event loop share
+    the same futures, so a burst of reruns sends one request per key.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def _join(self, key):
+        """Return (future, is_leader) for key, registering a new call if none is in flight"""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                return future, False
+            future = Future()
+            self._calls[key] = future
+            return future, True
+
+    def _finish(self, key, future, result=None, error=None):
+        with self._lock:
+            self._calls.pop(key, None)
+        if error is not None:
+            # Don't hand control-flow exceptions (rerun, interrupt) to other callers
+            if not isinstance(error, Exception):
+                error = RuntimeError(f"Coalesced call was interrupted: {error!r}")
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def do(self, key, func):
+        """Run func() once for all concurrent callers with the same key"""
+        future, is_leader = self._join(key)
+        if not is_leader:
+            return future.result()
+        try:
+            result = func()
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result)
+        return result
+
+    async def do_async(self, key, coroutine_func):
+        """Await coroutine_func() once for all concurrent callers with the same key"""
+        future, is_leader = self._join(key)
+        if not is_leader:
+            return await asyncio.wrap_future(future)
+        try:
+            result = await coroutine_func()
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result)
+        return result
+
+
+def request_key(method, url, params=None):
+    """Key identifying a request by endpoint and parameters, independent of param order"""
+    items = tuple(sorted((str(name), str(value)) for name, value in (params or {}).items()))
+    return (method.upper(), url, items)
@@ -0,0 +1,162 @@
+import glob
+import os
+import threading
+
+import numpy as np
+
+from config import get_cache_dir
+from downsample import downsample
+from resources import shared_resource
+
+# Pixel size sparkline images are drawn at, they are scaled to the column width
+SPARKLINE_WIDTH = 240
+SPARKLINE_HEIGHT = 45
+TOP_MARGIN = 10  # Room for the weekly price labels, as in the interactive sparkline
+
+UP_COLOR = '#00ff00'
+DOWN_COLOR = '#ff0000'
+
+
+def _kaleido_available():
+    """PNG export needs the optional kaleido package (pip install kaleido)"""
+    try:
+        import kaleido  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+KALEIDO = _kaleido_available()
+
+
+def _to_ms(values):
+    return np.asarray(values, dtype='datetime64[ms]').astype(np.int64)
+
+
+def sparkline_svg(dates, prices, shapes=(), annotations=(),
+                  width=SPARKLINE_WIDTH, height=SPARKLINE_HEIGHT):
+    """Draw a sparkline as an SVG document.
+
+    shapes and annotations take the weekly marker lines and labels in the
+    same dict form the interactive figure is given.
+    """
+    candles = np.ndim(prices) == 2
+    # A candle needs a few pixels to be readable, a line point about one
+    x, y = downsample(dates, prices, width // 4 if candles else width // 2)
+    x = x.astype(np.int64)
+    low = y[:, 2] if candles else y
+    high = y[:, 1] if candles else y
+
+    x_span = max(int(x[-1] - x[0]), 1)
+    y_min, y_max = float(np.nanmin(low)), float(np.nanmax(high))
+    y_span = (y_max - y_min) or 1.0
+
+    def px(values):
+        return (np.asarray(values, dtype=np.int64) - x[0]) * (width / x_span)
+
+    def py(values):
+        return TOP_MARGIN + (y_max - np.asarray(values, dtype=float)) * ((height - TOP_MARGIN) / y_span)
+
+    parts = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+             f'viewBox="0 0 {width} {height}">']
+
+    for shape in shapes:
+        marker = float(px(_to_ms([shape['x0']]))[0])
+        parts.append(f'<line x1="{marker:.1f}" y1="0" x2="{marker:.1f}" y2="{height}" '
+                     'stroke="rgba(255, 255, 255, 0.1)" stroke-width="1" stroke-dasharray="1,2"/>')
+
+    if candles:
+        xs = px(x)
+        body = max(width / len(x) * 0.6, 1.0)
+        rising = y[:, 3] >= y[:, 0]
+        opens, highs, lows, closes = (py(y[:, i]) for i in range(4))
+        for mask, color in ((rising, UP_COLOR), (~rising, DOWN_COLOR)):
+            wicks = ''.join(f'M{cx:.1f} {hi:.1f}V{lo:.1f}'
+                            for cx, hi, lo in zip(xs[mask], highs[mask], lows[mask]))
+            bodies = ''.join(
+                f'M{cx - body / 2:.1f} {min(o, c):.1f}h{body:.1f}v{max(abs(o - c), 0.5):.1f}h{-body:.1f}z'
+                for cx, o, c in zip(xs[mask], opens[mask], closes[mask])
+            )
+            if wicks:
+                parts.append(f'<path d="{wicks}" stroke="{color}" stroke-width="1"/>')
+                parts.append(f'<path d="{bodies}" fill="{color}"/>')
+    elif len(x) > 1:
+        xs, ys = px(x), py(y)
+        rising = y[1:] >= y[:-1]
+        for mask, color in ((rising, UP_COLOR), (~rising, DOWN_COLOR)):
+            segments = ''.join(f'M{x0:.1f} {y0:.1f}L{x1:.1f} {y1:.1f}'
+                               for x0, y0, x1, y1 in zip(xs[:-1][mask], ys[:-1][mask], xs[1:][mask], ys[1:][mask]))
+            if segments:
+                parts.append(f'<path d="{segments}" fill="none" stroke="{color}" stroke-width="1.5"/>')
+
+    for annotation in annotations:
+        ax = float(px(_to_ms([annotation['x']]))[0])
+        ay = float(py([annotation['y']])[0]) - (annotation['yshift'] or 0)
+        parts.append(f'<text x="{ax:.1f}" y="{max(ay, 8):.1f}" font-size="8" text-anchor="middle" '
+                     f'fill="rgba(255, 255, 255, 0.5)">{annotation["text"]}</text>')
+
+    parts.append('</svg>')
+    return ''.join(parts)
+
+
+class SparklineImageCache:
+    """Rendered sparkline images on disk.
+
+    Images are keyed by (coin_id, days, chart_type, last_candle_ts), so one
+    is drawn once per new candle and then served as a static file. PNG is
+    used when kaleido is installed, SVG otherwise.
+    """
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir or get_cache_dir('sparklines')
+        self.image_format = 'png' if KALEIDO else 'svg'
+        self._lock = threading.Lock()
+
+    def _prefix(self, coin_id, days, chart_type):
+        return os.path.join(self.cache_dir, f"{coin_id}_{days}_{chart_type}_")
+
+    def path(self, coin_id, days, chart_type, last_candle_ts):
+        return f"{self._prefix(coin_id, days, chart_type)}{last_candle_ts}.{self.image_format}"
+
+    def get(self, coin_id, days, chart_type, dates, prices, make_figure):
+        """Path of the image for a history, drawing it first if needed.
+
+        make_figure() builds the interactive figure, which is exported as is
+        to PNG; the SVG fallback takes its weekly markers from its layout.
+        """
+        if len(dates) == 0 or len(prices) == 0:
+            return None
+        last_candle_ts = int(np.asarray(dates, dtype='datetime64[ms]')[-1].astype(np.int64))
+        path = self.path(coin_id, days, chart_type, last_candle_ts)
+        if os.path.exists(path):
+            return path
+
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            fig = make_figure()
+            if self.image_format == 'png':
+                fig.write_image(tmp_path, format='png', width=SPARKLINE_WIDTH,
+                                height=SPARKLINE_HEIGHT, scale=2)
+            else:
+                with open(tmp_path, 'w') as f:
+                    f.write(sparkline_svg(dates, prices, fig.layout.shapes, fig.layout.annotations))
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"Error rendering sparkline image for {coin_id}: {e}")
+            return None
+
+        # Images of earlier candles are never shown again
+        with self._lock:
+            for old_path in glob.glob(glob.escape(self._prefix(coin_id, days, chart_type)) + '*'):
+                if old_path != path and not old_path.endswith('.tmp'):
+                    try:
+                        os.remove(old_path)
+                    except OSError:
+                        pass
+        return path
+
+
+@shared_resource
+def get_sparkline_image_cache():
+    """Get the sparkline image cache shared by every session of the process"""
+    return SparklineImageCache()
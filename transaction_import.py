@@ -0,0 +1,113 @@
+import os
+import time
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from database import get_connection
+from transactions_db import COLUMN_NAMES
+
+# Rows parsed and validated at a time
+IMPORT_CHUNK_SIZE = 10000
+
+# Columns a ledger file must have, by display name
+REQUIRED_COLUMNS = ['Date', 'Asset', 'Symbol', 'Quantity', 'Purchase Price']
+
+# Outcome of an import; rows_per_second counts imported and rejected rows
+ImportResult = namedtuple('ImportResult', ['imported', 'rejected', 'seconds', 'rows_per_second'])
+
+
+def read_chunks(source, name, chunk_size=IMPORT_CHUNK_SIZE):
+    """DataFrames of at most chunk_size rows from a .csv, .json or .jsonl ledger.
+
+    source is a path or a file object, name the file name its format is
+    taken from. CSV and JSON lines files are streamed; a JSON array or
+    table has to be parsed whole and is then cut into chunks.
+    """
+    extension = os.path.splitext(name)[1].lower()
+    if extension == '.csv':
+        yield from pd.read_csv(source, chunksize=chunk_size)
+    elif extension in ('.jsonl', '.ndjson'):
+        yield from pd.read_json(source, lines=True, chunksize=chunk_size)
+    elif extension == '.json':
+        df = pd.read_json(source)
+        for start in range(0, len(df), chunk_size):
+            yield df.iloc[start:start + chunk_size]
+    else:
+        raise ValueError(f"Unsupported file type '{extension}', use .csv, .json or .jsonl")
+
+
+def validate_chunk(df, coins=None):
+    """Normalize a chunk to transactions columns and drop invalid rows.
+
+    Columns may use display names or database names. Missing totals are
+    derived from quantity and price, as the sidebar form does. coins maps
+    display names to CoinGecko ids, as fetch_available_coins() returns them;
+    when given, a symbol that is not a known id is replaced by the id of the
+    row's asset name, and rows matching neither are dropped. Returns the
+    valid rows ordered like COLUMN_NAMES without id, and how many were dropped.
+    """
+    df = df.rename(columns=COLUMN_NAMES)
+    missing = [column for column in REQUIRED_COLUMNS if column not in df.columns]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+
+    dates = pd.to_datetime(df['Date'], errors='coerce')
+    asset = df['Asset'].astype('string').str.strip()
+    symbol = df['Symbol'].astype('string').str.strip().str.lower()
+    if coins is not None:
+        # Tickers such as 'BTC' are not ids, resolve them through the asset's 'Bitcoin (BTC)' name
+        known = symbol.isin(set(coins.values())).to_numpy(dtype=bool)
+        symbol = symbol.where(known, asset.map(coins).astype('string'))
+    quantity = pd.to_numeric(df['Quantity'], errors='coerce')
+    purchase_price = pd.to_numeric(df['Purchase Price'], errors='coerce')
+    total_invested = quantity * purchase_price
+    if 'Total Cash Invested' in df.columns:
+        total_invested = pd.to_numeric(df['Total Cash Invested'], errors='coerce').fillna(total_invested)
+    current_price = purchase_price
+    if 'Current Price' in df.columns:
+        current_price = pd.to_numeric(df['Current Price'], errors='coerce').fillna(purchase_price)
+
+    valid = (
+        dates.notna().to_numpy()
+        & (asset.fillna('') != '').to_numpy(dtype=bool)
+        & (symbol.fillna('') != '').to_numpy(dtype=bool)
+        & np.isfinite(quantity.to_numpy(dtype=float)) & (quantity > 0).to_numpy()
+        & np.isfinite(purchase_price.to_numpy(dtype=float)) & (purchase_price > 0).to_numpy()
+        & np.isfinite(total_invested.to_numpy(dtype=float))
+    )
+    rows = pd.DataFrame({
+        'Date': dates.dt.strftime('%Y-%m-%d %H:%M'),
+        'Asset': asset,
+        'Symbol': symbol,
+        'Quantity': quantity,
+        'Purchase Price': purchase_price,
+        'Total Cash Invested': total_invested,
+        'Current Price': current_price,
+        'Profit/Loss': (current_price - purchase_price) * quantity,
+    })[valid]
+    return rows.astype(object), int((~valid).sum())
+
+
+def import_transactions(source, name, db_path=None, coins=None, chunk_size=IMPORT_CHUNK_SIZE):
+    """Bulk insert a ledger file into the transactions table.
+
+    Every chunk is inserted with executemany inside one transaction, so an
+    import either lands completely or not at all. coins is passed on to
+    validate_chunk() to check each row's coin. Raises ValueError for an
+    unreadable file or missing columns and sqlite3.Error if the insert fails.
+    """
+    columns = [column for column in COLUMN_NAMES if column != 'id']
+    sql = f"INSERT INTO transactions ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+    started = time.perf_counter()
+    imported = rejected = 0
+    conn = get_connection(db_path)
+    with conn:
+        for chunk in read_chunks(source, name, chunk_size):
+            rows, dropped = validate_chunk(chunk, coins)
+            conn.executemany(sql, rows.itertuples(index=False, name=None))
+            imported += len(rows)
+            rejected += dropped
+    seconds = time.perf_counter() - started
+    return ImportResult(imported, rejected, seconds, (imported + rejected) / seconds if seconds else 0.0)
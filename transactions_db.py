@@ -0,0 +1,151 @@
+import sqlite3
+
+import pandas as pd
+
+from database import get_connection
+
+# Display name of each transactions column, as the pages show them
+COLUMN_NAMES = {
+    'id': 'id',
+    'date': 'Date',
+    'asset': 'Asset',
+    'symbol': 'Symbol',
+    'quantity': 'Quantity',
+    'purchase_price': 'Purchase Price',
+    'total_cash_invested': 'Total Cash Invested',
+    'current_price': 'Current Price',
+    'profit_loss': 'Profit/Loss',
+}
+
+# Trigger bodies adding a NEW transaction to its asset's position, and taking an OLD one out
+POSITION_ADD = '''
+            INSERT INTO positions VALUES
+            (NEW.asset, NEW.symbol, IFNULL(NEW.quantity, 0), IFNULL(NEW.total_cash_invested, 0),
+             IFNULL(NEW.quantity * NEW.purchase_price, 0), IFNULL(NEW.quantity * NEW.current_price, 0), 1)
+            ON CONFLICT (asset) DO UPDATE SET
+                quantity = quantity + excluded.quantity,
+                total_cash_invested = total_cash_invested + excluded.total_cash_invested,
+                cost_basis = cost_basis + excluded.cost_basis,
+                stored_value = stored_value + excluded.stored_value,
+                transactions = transactions + 1;
+'''
+POSITION_SUBTRACT = '''
+            UPDATE positions SET
+                quantity = quantity - IFNULL(OLD.quantity, 0),
+                total_cash_invested = total_cash_invested - IFNULL(OLD.total_cash_invested, 0),
+                cost_basis = cost_basis - IFNULL(OLD.quantity * OLD.purchase_price, 0),
+                stored_value = stored_value - IFNULL(OLD.quantity * OLD.current_price, 0),
+                transactions = transactions - 1
+            WHERE asset = OLD.asset;
+            DELETE FROM positions WHERE asset = OLD.asset AND transactions <= 0;
+'''
+# Trigger body for an edit that keeps the asset, applied to its row in place so the row keeps its order
+POSITION_CHANGE = '''
+            UPDATE positions SET
+                quantity = quantity - IFNULL(OLD.quantity, 0) + IFNULL(NEW.quantity, 0),
+                total_cash_invested = total_cash_invested - IFNULL(OLD.total_cash_invested, 0)
+                                      + IFNULL(NEW.total_cash_invested, 0),
+                cost_basis = cost_basis - IFNULL(OLD.quantity * OLD.purchase_price, 0)
+                             + IFNULL(NEW.quantity * NEW.purchase_price, 0),
+                stored_value = stored_value - IFNULL(OLD.quantity * OLD.current_price, 0)
+                               + IFNULL(NEW.quantity * NEW.current_price, 0)
+            WHERE asset = NEW.asset;
+'''
+
+# Schema changes in order; PRAGMA user_version holds how many have been applied
+MIGRATIONS = [
+    # 1: an index holding every column position totals read, so they never
+    # touch the table; its leading asset column also serves lookups by asset
+    [
+        "CREATE INDEX IF NOT EXISTS idx_transactions_position "
+        "ON transactions (asset, symbol, quantity, total_cash_invested)",
+    ],
+    # 2: per-asset totals kept current by triggers. cost_basis sums quantity *
+    # purchase_price and stored_value quantity * current_price, so the
+    # profit/loss of an asset follows from its row and one price.
+    [
+        '''
+        CREATE TABLE IF NOT EXISTS positions
+        (asset TEXT PRIMARY KEY,
+         symbol TEXT,
+         quantity REAL NOT NULL DEFAULT 0,
+         total_cash_invested REAL NOT NULL DEFAULT 0,
+         cost_basis REAL NOT NULL DEFAULT 0,
+         stored_value REAL NOT NULL DEFAULT 0,
+         transactions INTEGER NOT NULL DEFAULT 0)
+        ''',
+        "DELETE FROM positions",
+        '''
+        INSERT INTO positions
+        SELECT asset, MIN(symbol), TOTAL(quantity), TOTAL(total_cash_invested),
+               TOTAL(quantity * purchase_price), TOTAL(quantity * current_price), COUNT(*)
+        FROM transactions GROUP BY asset
+        ''',
+        f"CREATE TRIGGER IF NOT EXISTS positions_after_insert AFTER INSERT ON transactions "
+        f"BEGIN {POSITION_ADD} END",
+        f"CREATE TRIGGER IF NOT EXISTS positions_after_delete AFTER DELETE ON transactions "
+        f"BEGIN {POSITION_SUBTRACT} END",
+        f"CREATE TRIGGER IF NOT EXISTS positions_after_update AFTER UPDATE ON transactions "
+        f"WHEN OLD.asset IS NEW.asset BEGIN {POSITION_CHANGE} END",
+        f"CREATE TRIGGER IF NOT EXISTS positions_after_asset_change AFTER UPDATE ON transactions "
+        f"WHEN OLD.asset IS NOT NEW.asset BEGIN {POSITION_SUBTRACT} {POSITION_ADD} END",
+    ],
+]
+
+
+def migrate_transactions(db_path=None):
+    """Apply the schema migrations the transactions table has not had yet"""
+    try:
+        conn = get_connection(db_path)
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        for number, statements in enumerate(MIGRATIONS[version:], start=version + 1):
+            with conn:
+                # DDL does not open a transaction by itself, this makes each migration atomic
+                conn.execute("BEGIN")
+                for statement in statements:
+                    conn.execute(statement)
+                conn.execute(f"PRAGMA user_version = {number}")
+        if version < len(MIGRATIONS):
+            # Let the planner know about the new indexes
+            conn.execute("ANALYZE transactions")
+    except sqlite3.Error as e:
+        print(f"Error migrating transactions table: {e}")
+
+
+def position_totals(db_path=None, asset=None):
+    """Total quantity, cash invested and transaction count of each asset.
+
+    Read from idx_transactions_position alone, without touching the table.
+    """
+    sql = ("SELECT asset, symbol, SUM(quantity), SUM(total_cash_invested), COUNT(*) "
+           "FROM transactions")
+    params = []
+    if asset is not None:
+        sql += " WHERE asset = ?"
+        params.append(asset)
+    sql += " GROUP BY asset, symbol"
+    columns = ['Asset', 'Symbol', 'Quantity', 'Total Cash Invested', 'Transactions']
+    try:
+        rows = get_connection(db_path).execute(sql, params).fetchall()
+        return pd.DataFrame(rows, columns=columns)
+    except sqlite3.Error as e:
+        print(f"Error reading position totals: {e}")
+        return pd.DataFrame(columns=columns)
+
+
+def load_positions(db_path=None):
+    """Every row of the trigger-maintained positions table.
+
+    Cost Basis is the sum of quantity * purchase price and Stored Value the
+    sum of quantity * the current price saved with each transaction.
+    """
+    columns = ['Asset', 'Symbol', 'Quantity', 'Total Cash Invested', 'Cost Basis', 'Stored Value', 'Transactions']
+    try:
+        rows = get_connection(db_path).execute(
+            "SELECT asset, symbol, quantity, total_cash_invested, cost_basis, stored_value, transactions "
+            "FROM positions ORDER BY rowid"
+        ).fetchall()
+        return pd.DataFrame(rows, columns=columns)
+    except sqlite3.Error as e:
+        print(f"Error reading positions: {e}")
+        return pd.DataFrame(columns=columns)